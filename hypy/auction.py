@@ -1,10 +1,10 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from datetime import datetime
 from itertools import chain
 from .uuid import UUID
 from .hypyobject import HypyObject
-from .utils import unpack_nbt, decode_nbt, get_auction_lores
+from .utils import unpack_nbt, decode_nbt, get_safe_content
 from .skyblockinventories import SkyblockItemSlot
 
 if TYPE_CHECKING:
@@ -18,76 +18,123 @@ def multi_init(pages: List[dict], hypy: Hypixel) -> Tuple[List[dict], List[Aucti
     auctions = list(
         chain.from_iterable([x["auctions"] for x in pages])
     )  # join all auctions from all pages into one list
-    lores = get_auction_lores(auctions)
-    return (
-        auctions,
-        [Auction.init(info[0], info[1], hypy) for info in zip(auctions, lores)],
-    )
+    return auctions, [Auction(data, hypy) for data in auctions]
 
 
 class Auction(HypyObject):
-    """A Hypixel SkyBlock Auction"""
+    """A Hypixel SkyBlock Auction
+
+    This is a view over the raw auction data, fields are read from it when accessed
+    """
+
+    __slots__ = ("_raw", "_hypy", "_lore", "_auctioneer")
 
-    _uuid: str
     _raw: dict
     _hypy: Hypixel
-    auctioneer_uuid: UUID
-    """The UUID of the auctioneer"""
-    profile_id: str
-    """The profile id of the auctioneer"""
-    _start: int
-    _end: int
-    item_name: str
-    """The name of the item"""
-    item_lore: str
-    """The lore of the item
-    If you want cleaned lore (without colorcodes) use `safe_item_lore` instead
-    """
-    safe_item_lore: str
-    """The lore without any formatting"""
-    item_category: str
-    """The auction house category of the item"""
-    tier: str
-    """The rarity of the item"""
-    starting_bid: str
-    """The starting bid of the item"""
-    _bytes: str
-    bin: bool
-    """Whether the auction is BIN (Buy it now) or not"""
-    highest_bid: int
-    """The highest bid of the auction"""
-
-    def __init__(self, data, hypy) -> None:
+
+    def __init__(self, data, hypy, lore: Optional[str] = None) -> None:
         self._hypy = hypy
         self._raw = data
-        self._uuid = data["uuid"]
-        self.auctioneer_uuid = UUID(data["auctioneer"])
-        self._start = data["start"]
-        self._end = data["end"]
-        self._bytes = data["item_bytes"]
+        self._lore = lore
+        self._auctioneer: Optional[UUID] = None
 
     @staticmethod
     def init(data, lore, hypy) -> Auction:
         """Initialize an Auction object"""
-        auc = Auction(data, hypy)
-        auc.profile_id = data["profile_id"]
-        auc.item_name = data["item_name"]
-        auc.item_lore = data["item_lore"]
-        auc.safe_item_lore = lore
-        auc.item_category = data["category"]
-        auc.tier = data["tier"]
-        auc.starting_bid = data["starting_bid"]
-        auc.bin = data["bin"] if ("bin" in data) else False
-        auc.highest_bid = data["highest_bid_amount"]
-        return auc
+        return Auction(data, hypy, lore)
 
     def __str__(self) -> str:
         return f"<hypy.Auction item_name={self.item_name}>"
 
+    @property
+    def raw(self) -> dict:
+        """The API data of the auction. Do not modify it"""
+        return self._raw
+
+    @property
+    def _uuid(self) -> str:
+        return self._raw["uuid"]
+
+    @property
+    def _start(self) -> int:
+        return self._raw["start"]
+
+    @property
+    def _end(self) -> int:
+        return self._raw["end"]
+
+    @property
+    def _bytes(self) -> str:
+        return self._raw["item_bytes"]
+
+    @property
+    def auctioneer_uuid(self) -> UUID:
+        """The UUID of the auctioneer"""
+        if self._auctioneer is None:
+            self._auctioneer = UUID(self._raw["auctioneer"])
+        return self._auctioneer
+
+    @property
+    def profile_id(self) -> str:
+        """The profile id of the auctioneer"""
+        return self._raw["profile_id"]
+
+    @property
+    def item_name(self) -> str:
+        """The name of the item"""
+        return self._raw["item_name"]
+
+    @property
+    def item_lore(self) -> str:
+        """The lore of the item
+        If you want cleaned lore (without colorcodes) use `safe_item_lore` instead
+        """
+        return self._raw["item_lore"]
+
+    @property
+    def safe_item_lore(self) -> str:
+        """The lore without any formatting"""
+        if self._lore is None:
+            self._lore = get_safe_content(self._raw["item_lore"])
+        return self._lore
+
+    @property
+    def item_category(self) -> str:
+        """The auction house category of the item"""
+        return self._raw["category"]
+
+    @property
+    def tier(self) -> str:
+        """The rarity of the item"""
+        return self._raw["tier"]
+
+    @property
+    def starting_bid(self) -> int:
+        """The starting bid of the item"""
+        return self._raw["starting_bid"]
+
+    @property
+    def bin(self) -> bool:
+        """Whether the auction is BIN (Buy it now) or not"""
+        return self._raw.get("bin", False)
+
+    @property
+    def highest_bid(self) -> int:
+        """The highest bid of the auction"""
+        return self._raw["highest_bid_amount"]
+
     @property
     def nbt_item(self) -> SkyblockItemSlot:
-        """A SkyblockItemSlot for this auction"""
-        return SkyblockItemSlot(unpack_nbt(decode_nbt(self._raw["item_bytes"]))["i"][0])
+        """A SkyblockItemSlot for this auction
+
+        Decoded items are cached in Hypixel.item_cache, see SkyblockAuctions.decode_items to decode many at once
+        """
+        cache = self._hypy.item_cache if self._hypy is not None else {}
+        item = cache.get(self._uuid)
+        if item is None:
+            item = SkyblockItemSlot(unpack_nbt(decode_nbt(self._raw["item_bytes"]))["i"][0])
+            cache[self._uuid] = item
+        return item
 
     @property
     def start(self) -> datetime:
@@ -0,0 +1,145 @@
+from typing import Dict, List, Tuple
+from itertools import chain
+from .exceptions import MissingDependencyException
+from .pricing import clean_name
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, install hypy-hypixel[numpy]
+    np = None
+
+
+def multi_init_columns(pages: List[dict]) -> Tuple[List[dict], "AuctionColumns"]:
+    """join multiple pages and build their columns at once, use asyncio.to_thread for this"""
+    auctions = list(chain.from_iterable([x["auctions"] for x in pages]))
+    return auctions, AuctionColumns.from_records(auctions)
+
+
+class AuctionColumns:
+    """A columnar view of auction data backed by NumPy arrays
+
+    Row i describes the same auction as SkyblockAuctions[i]. Strings like tiers, categories and item names
+    are stored as codes into the lists ``tiers``, ``categories`` and ``names``.
+    """
+
+    __slots__ = (
+        "starting_bid",
+        "highest_bid",
+        "start",
+        "end",
+        "bin",
+        "tier",
+        "category",
+        "name",
+        "tiers",
+        "categories",
+        "names",
+    )
+
+    starting_bid: "np.ndarray"
+    """Starting bids"""
+    highest_bid: "np.ndarray"
+    """Highest bids"""
+    start: "np.ndarray"
+    """Start times in milliseconds"""
+    end: "np.ndarray"
+    """End times in milliseconds"""
+    bin: "np.ndarray"
+    """Whether the auctions are BIN"""
+    tier: "np.ndarray"
+    """Codes into tiers"""
+    category: "np.ndarray"
+    """Codes into categories"""
+    name: "np.ndarray"
+    """Codes into names"""
+    tiers: List[str]
+    """All tiers"""
+    categories: List[str]
+    """All categories"""
+    names: List[str]
+    """All item names"""
+
+    def __init__(self, columns: Dict[str, "np.ndarray"], tiers, categories, names) -> None:
+        for key, column in columns.items():
+            setattr(self, key, column)
+        self.tiers = tiers
+        self.categories = categories
+        self.names = names
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> "AuctionColumns":
+        """Build columns from raw auction data
+
+        :param records: Raw auction data as returned by the API
+        """
+        if np is None:
+            raise MissingDependencyException("numpy")
+        tier: Dict[str, int] = {}
+        category: Dict[str, int] = {}
+        name: Dict[str, int] = {}
+
+        def codes(key: str, table: Dict[str, int]) -> "np.ndarray":
+            return np.fromiter(
+                (table.setdefault(data[key], len(table)) for data in records),
+                dtype=np.int32,
+                count=len(records),
+            )
+
+        def ints(key: str) -> "np.ndarray":
+            return np.fromiter(
+                (data[key] for data in records), dtype=np.int64, count=len(records)
+            )
+
+        columns = {
+            "starting_bid": ints("starting_bid"),
+            "highest_bid": ints("highest_bid_amount"),
+            "start": ints("start"),
+            "end": ints("end"),
+            "bin": np.fromiter(
+                (data.get("bin", False) for data in records),
+                dtype=np.bool_,
+                count=len(records),
+            ),
+            "tier": codes("tier", tier),
+            "category": codes("category", category),
+            "name": codes("item_name", name),
+        }
+        return cls(columns, list(tier), list(category), list(name))
+
+    def __len__(self) -> int:
+        return len(self.starting_bid)
+
+    def lowest_bins(self) -> Dict[str, int]:
+        """The lowest BIN price of every item name without color codes and stars, keyed like SkyblockAuctions.lowest_bins"""
+        rows = np.flatnonzero(self.bin)
+        # sort by name, then by price, the first row of every name is the cheapest
+        order = rows[np.lexsort((self.starting_bid[rows], self.name[rows]))]
+        names, first = np.unique(self.name[order], return_index=True)
+        prices = self.starting_bid[order[first]]
+        lowest: Dict[str, int] = {}
+        for n, p in zip(names, prices):
+            # names that only differ in colors or stars are the same item
+            key = clean_name(self.names[n])
+            lowest[key] = min(lowest.get(key, int(p)), int(p))
+        return lowest
+
+    def count_by_tier(self) -> Dict[str, int]:
+        """The amount of auctions of every tier"""
+        counts = np.bincount(self.tier, minlength=len(self.tiers))
+        return {tier: int(count) for tier, count in zip(self.tiers, counts)}
+
+    def count_by_category(self) -> Dict[str, int]:
+        """The amount of auctions of every category"""
+        counts = np.bincount(self.category, minlength=len(self.categories))
+        return {cat: int(count) for cat, count in zip(self.categories, counts)}
+
+    def rows_named(self, name: str) -> "np.ndarray":
+        """Rows of all auctions with an item name
+
+        :param name: The exact item name
+        """
+        try:
+            code = self.names.index(name)
+        except ValueError:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.name == code)
@@ -1,8 +1,28 @@
-from typing import Union, List
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple, Union, List
+from datetime import datetime, timedelta, timezone
+from bisect import bisect_left, bisect_right
+import asyncio
 from enum import Enum, auto
 from .auction import Auction
 from .uuid import UUID
 from .hypyobject import HypyObject
+from .models import AuctionDelta
+from .exceptions import InvalidQueryTypeException
+from .utils import get_safe_content, decode_item_bytes, to_ms
+from .skyblockinventories import SkyblockItemSlot
+from .pricing import PriceIndex, name_key
+from .auctioncolumns import AuctionColumns
+from .tokenindex import TokenIndex
+from .utils import is_username
+
+if TYPE_CHECKING:
+    from .query import AuctionQuery, Condition
+
+PRICE_KEYS: Dict[str, str] = {
+    "starting_bid": "starting_bid",
+    "highest_bid": "highest_bid_amount",
+}
+"""The keys of the API data for the prices auctions can be filtered by"""
 
 
 class FilterType(Enum):
@@ -11,24 +31,381 @@ class FilterType(Enum):
     NAME = auto()
     AUCTIONEER = auto()
     LORE = auto()
+    PROFILE = auto()
 
 
 class SkyblockAuctions(HypyObject):
-    """SkyBlock Auction data"""
+    """SkyBlock Auction data
+
+    Auction objects are created on first access if the snapshot was built without them (eg. with get_auctions(columnar=True))
+    """
 
-    __slots__ = ("_raw", "_auctions", "_hypy", "_num")
+    __slots__ = (
+        "_raw",
+        "_auctions",
+        "_hypy",
+        "_num",
+        "_last_updated",
+        "_positions",
+        "_delta",
+        "_columns",
+        "_indexes",
+        "_lores",
+        "_owners",
+        "_prices",
+        "_ranges",
+    )
 
-    def __init__(self, data, auc, hypy) -> None:
+    def __init__(
+        self,
+        data,
+        auc,
+        hypy,
+        last_updated: int = 0,
+        columns: Optional[AuctionColumns] = None,
+    ) -> None:
         self._raw = data
-        self._auctions = auc
+        self._auctions: List[Optional[Auction]] = (
+            [None] * len(data) if auc is None else auc
+        )
         self._num = len(data)
         self._hypy = hypy
+        self._last_updated = last_updated
+        self._positions: Optional[Dict[str, int]] = None
+        self._delta: Optional[AuctionDelta] = None
+        self._columns = columns
+        self._indexes: Dict[FilterType, TokenIndex] = {}
+        self._lores: Optional[List[str]] = None
+        self._owners: Dict[FilterType, Dict[str, List[int]]] = {}
+        self._prices: Dict[str, PriceIndex] = {}
+        self._ranges: Dict[str, Tuple[List[int], List[int]]] = {}
 
     def __len__(self) -> int:
         return self._num
 
+    def _auction_at(self, pos: int) -> Auction:
+        auction = self._auctions[pos]
+        if auction is None:
+            data = self._raw[pos]
+            auction = Auction(data, self._hypy)
+            self._auctions[pos] = auction
+        return auction
+
     def __getitem__(self, key) -> Auction:
-        return self._auctions[key]
+        if isinstance(key, slice):
+            return [self._auction_at(i) for i in range(*key.indices(self._num))]
+        return self._auction_at(range(self._num)[key])
+
+    def __iter__(self) -> Iterator[Auction]:
+        for i in range(self._num):
+            yield self._auction_at(i)
+
+    @property
+    def columns(self) -> AuctionColumns:
+        """A columnar view of this snapshot, requires numpy"""
+        if self._columns is None:
+            self._columns = AuctionColumns.from_records(self._raw)
+        return self._columns
+
+    def _invalidate(self) -> None:
+        """Drop everything derived from the auction data after it changed"""
+        self._columns = None
+        self._indexes = {}
+        self._lores = None
+        self._owners = {}
+        self._ranges = {}
+
+    def _texts(self, by: FilterType) -> List[str]:
+        if by == FilterType.NAME:
+            return [data["item_name"] for data in self._raw]
+        if self._lores is None:
+            self._lores = [
+                get_safe_content(data["item_lore"])
+                if auction is None
+                else auction.safe_item_lore
+                for data, auction in zip(self._raw, self._auctions)
+            ]
+        return self._lores
+
+    @property
+    def records(self) -> List[dict]:
+        """The API data of every auction by position. Do not modify it"""
+        return self._raw
+
+    def text_index(self, by: FilterType) -> TokenIndex:
+        """The word index of the item names or lores, it is built on first use
+
+        :param by: Either FilterType.NAME or FilterType.LORE
+        """
+        index = self._indexes.get(by)
+        if index is None:
+            index = self._indexes[by] = TokenIndex(self._texts(by))
+        return index
+
+    def indexed_texts(self, by: FilterType) -> Optional[List[str]]:
+        """The normalized item names or lores by position, None if their word index was not built yet
+
+        :param by: Either FilterType.NAME or FilterType.LORE
+        """
+        index = self._indexes.get(by)
+        return None if index is None else index.texts
+
+    def _owner_index(self, by: FilterType) -> Dict[str, List[int]]:
+        index = self._owners.get(by)
+        if index is None:
+            key = "auctioneer" if by == FilterType.AUCTIONEER else "profile_id"
+            index = {}
+            for i, data in enumerate(self._raw):
+                owner = data[key]
+                if owner in index:
+                    index[owner].append(i)
+                else:
+                    index[owner] = [i]
+            self._owners[by] = index
+        return index
+
+    def owner_rows(self, by: FilterType, owner: str) -> List[int]:
+        """Positions of the auctions of a player or profile in ascending order
+
+        :param by: Either FilterType.AUCTIONEER or FilterType.PROFILE
+        :param owner: The uuid of the player or the id of the profile, with or without dashes in any case
+        """
+        return self._owner_index(by).get(owner.replace("-", "").lower(), [])
+
+    def _id_key(self, data: dict) -> str:
+        item = self._hypy.item_cache.get(data["uuid"])
+        if item is not None and item.skyblock_item_id:
+            return item.skyblock_item_id
+        return name_key(data)
+
+    def lowest_bins(self, by: str = "name") -> PriceIndex:
+        """BIN prices per item, computed once and kept up to date by update
+
+        :param by: Either "name" to group by item name without color codes and stars, or "id" to group by
+            skyblock item id. Ids are only known for items decoded with decode_items, other auctions are grouped by name
+        """
+        if by not in ("name", "id"):
+            raise InvalidQueryTypeException(by)
+        index = self._prices.get(by)
+        if index is None:
+            key = name_key if by == "name" else self._id_key
+            index = self._prices[by] = PriceIndex.from_records(self._raw, key)
+        return index
+
+    def take(self, rows: Iterable[int]) -> List[Auction]:
+        """Get the auctions at the given rows, eg. rows of columns
+
+        :param rows: Positions of auctions in this snapshot
+        """
+        return [self._auction_at(int(i)) for i in rows]
+
+    def _position_index(self) -> Dict[str, int]:
+        if self._positions is None:
+            self._positions = {data["uuid"]: i for i, data in enumerate(self._raw)}
+        return self._positions
+
+    def get(self, auction_uuid: str) -> Optional[Auction]:
+        """Get an auction by its uuid, None if it is not part of this snapshot
+
+        :param auction_uuid: The uuid of the auction
+        """
+        pos = self._position_index().get(auction_uuid.replace("-", ""))
+        return None if pos is None else self._auction_at(pos)
+
+    def record(self, auction_uuid: str) -> Optional[dict]:
+        """Get the API data of an auction by its uuid without creating an Auction, None if it is not part of this snapshot
+
+        :param auction_uuid: The uuid of the auction
+        """
+        pos = self._position_index().get(auction_uuid.replace("-", ""))
+        return None if pos is None else self._raw[pos]
+
+    def __contains__(self, auction_uuid) -> bool:
+        return auction_uuid.replace("-", "") in self._position_index()
+
+    def _remove_at(self, pos: int) -> Auction:
+        """Remove the auction at pos by swapping the last auction into its place"""
+        positions = self._position_index()
+        auction = self._auction_at(pos)
+        last = len(self._raw) - 1
+        if pos != last:
+            self._raw[pos] = self._raw[last]
+            self._auctions[pos] = self._auctions[last]
+            positions[self._raw[pos]["uuid"]] = pos
+        self._raw.pop()
+        self._auctions.pop()
+        del positions[auction.raw["uuid"]]
+        return auction
+
+    def update(
+        self,
+        changed: Iterable[dict],
+        removed: Iterable[str] = (),
+        last_updated: Optional[int] = None,
+    ) -> AuctionDelta:
+        """Update this snapshot in place
+
+        :param changed: Raw auction data of new or changed auctions
+        :param removed: The uuids of auctions that ended
+        :param last_updated: The lastUpdated value of the API data the changes came from
+        """
+        positions = self._position_index()
+        delta = AuctionDelta([], [], [])
+        for auction_uuid in removed:
+            pos = positions.get(auction_uuid.replace("-", ""))
+            if pos is not None:
+                delta.removed.append(self._remove_at(pos))
+                if self._hypy is not None:
+                    self._hypy.item_cache.pop(auction_uuid.replace("-", ""), None)
+        for data in changed:
+            pos = positions.get(data["uuid"])
+            if pos is not None and self._raw[pos] == data:
+                continue
+            auction = Auction(data, self._hypy)
+            if pos is None:
+                positions[data["uuid"]] = len(self._raw)
+                self._raw.append(data)
+                self._auctions.append(auction)
+                delta.added.append(auction)
+            else:
+                self._raw[pos] = data
+                self._auctions[pos] = auction
+                delta.updated.append(auction)
+        self._num = len(self._raw)
+        self._invalidate()
+        for prices in self._prices.values():
+            prices.apply(delta)
+        if last_updated is not None:
+            self._last_updated = last_updated
+        self._delta = delta
+        return delta
+
+    def sorted_by(self, key: str) -> Tuple[List[int], List[int]]:
+        """Values of a key of the API data in ascending order and the positions of their auctions
+
+        :param key: The key, eg. "starting_bid"
+        """
+        index = self._ranges.get(key)
+        if index is None:
+            values = [data[key] for data in self._raw]
+            order = sorted(range(len(values)), key=values.__getitem__)
+            index = self._ranges[key] = ([values[i] for i in order], order)
+        return index
+
+    def _range(
+        self, key: str, low: Optional[int], high: Optional[int], bin_only: bool = False
+    ) -> List[Auction]:
+        values, order = self.sorted_by(key)
+        first = 0 if low is None else bisect_left(values, low)
+        last = len(values) if high is None else bisect_right(values, high)
+        rows = order[first:last]
+        if bin_only:
+            rows = [i for i in rows if self._raw[i].get("bin", False)]
+        return [self._auction_at(i) for i in rows]
+
+    def price_range(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        *,
+        by: str = "starting_bid",
+        bin_only: bool = False,
+    ) -> List[Auction]:
+        """Auctions with a price between low and high (both inclusive), cheapest first
+
+        :param low: The minimum price, None for no minimum
+        :param high: The maximum price, None for no maximum
+        :param by: Either "starting_bid" or "highest_bid"
+        :param bin_only: Whether to only return BIN auctions
+        """
+        if by not in PRICE_KEYS:
+            raise InvalidQueryTypeException(by)
+        return self._range(PRICE_KEYS[by], low, high, bin_only)
+
+    def ending_between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[Auction]:
+        """Auctions ending between start and end (both inclusive), the one ending first comes first
+
+        :param start: The earliest end time, None for no limit
+        :param end: The latest end time, None for no limit
+        """
+        return self._range("end", to_ms(start), to_ms(end))
+
+    def ending_within(self, seconds: float) -> List[Auction]:
+        """Auctions ending in the next seconds, the one ending first comes first
+
+        :param seconds: The amount of seconds
+        """
+        now = datetime.now(timezone.utc)
+        return self.ending_between(now, now + timedelta(seconds=seconds))
+
+    @property
+    def delta(self) -> Optional[AuctionDelta]:
+        """The changes made by the last update, None if this snapshot was never updated"""
+        return self._delta
+
+    @property
+    def last_updated(self) -> int:
+        """The lastUpdated value of the API data this snapshot was built from"""
+        return self._last_updated
+
+    @property
+    def timestamp(self) -> datetime:
+        """The time when the auction data was last updated by Hypixel"""
+        return datetime.utcfromtimestamp(self._last_updated / 1000)
+
+    def _drop_stale_items(self) -> None:
+        """Drop cached items of auctions that are not part of this snapshot from Hypixel.item_cache"""
+        cache = self._hypy.item_cache
+        if cache:
+            positions = self._position_index()
+            for auction_uuid in [key for key in cache if key not in positions]:
+                del cache[auction_uuid]
+
+    async def decode_items(
+        self, auctions: Iterable[Auction] = None, *, chunk_size: int = 1000
+    ) -> Dict[str, SkyblockItemSlot]:
+        """Decode the items of many auctions at once
+
+        Items are decoded in Hypixel.executor if decode_workers was passed, otherwise in a thread.
+        Results are kept in Hypixel.item_cache, so auctions that were decoded before, even in an
+        earlier snapshot, are not decoded again. Cached items of auctions that ended are dropped by get_auctions and update.
+
+        :param auctions: The auctions to decode, defaults to all auctions
+        :param chunk_size: The amount of items decoded per task
+        :return: A dictionary of auction uuid to SkyblockItemSlot
+        """
+        cache = self._hypy.item_cache
+        records = self._raw if auctions is None else [a._raw for a in auctions]
+        # items are collected as they are found, the cache may drop some of them before this returns
+        items: Dict[str, SkyblockItemSlot] = {}
+        missing = []
+        for data in records:
+            item = cache.get(data["uuid"])
+            if item is None:
+                missing.append(data)
+            else:
+                items[data["uuid"]] = item
+        chunks = [
+            [data["item_bytes"] for data in missing[i : i + chunk_size]]
+            for i in range(0, len(missing), chunk_size)
+        ]
+        executor = self._hypy.executor
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            decoded = await asyncio.gather(
+                *[loop.run_in_executor(executor, decode_item_bytes, c) for c in chunks]
+            )
+        else:
+            decoded = await asyncio.gather(
+                *[asyncio.to_thread(decode_item_bytes, c) for c in chunks]
+            )
+        for data, item in zip(missing, (i for chunk in decoded for i in chunk)):
+            items[data["uuid"]] = cache[data["uuid"]] = SkyblockItemSlot(item)
+        if auctions is None:
+            self._drop_stale_items()
+        return items
 
     async def find_auctions(
         self,
@@ -39,37 +416,54 @@ class SkyblockAuctions(HypyObject):
         """Find Auctions
 
         :param by: What to filter by
-        :param query: The query
+        :param query: The query, for AUCTIONEER this can be a name or uuid, for PROFILE a profile id
         :param case_sensitive: Whether searching should be case sensitive
         """
-        if not case_sensitive:
-            query = query.lower()
         if isinstance(by, str):
             by = FilterType[str(by).upper()]
-        if by == FilterType.NAME:
-            return [
-                auction
-                for auction in self._auctions
-                if query
-                in (auction.item_name if case_sensitive else auction.item_name.lower())
-            ]
-        if by == FilterType.AUCTIONEER:
-            auc_uuid = UUID(await self._hypy.mojang.name_to_uuid(query)).no_dashes
-            return [
-                auction
-                for auction in self._auctions
-                if auc_uuid == auction.auctioneer_uuid.no_dashes
-            ]
-        if by == FilterType.LORE:
-            return [
-                auction
-                for auction in self._auctions
-                if query
-                in (
-                    auction.safe_item_lore
-                    if case_sensitive
-                    else auction.safe_item_lore.lower()
-                )
-            ]
-        else:
+        if by in (FilterType.NAME, FilterType.LORE):
+            if case_sensitive:
+                return [
+                    self._auction_at(i)
+                    for i, text in enumerate(self._texts(by))
+                    if query in text
+                ]
+            index = await asyncio.to_thread(self.text_index, by)
+            return self.take(index.substring(query))
+        if by in (FilterType.AUCTIONEER, FilterType.PROFILE):
+            if by == FilterType.AUCTIONEER:
+                if is_username(query):
+                    query = await self._hypy.mojang.name_to_uuid(query)
+                query = UUID(query).no_dashes
+            return self.take(self.owner_rows(by, query))
+        return []
+
+    async def search(
+        self,
+        query: str,
+        by: Union[str, FilterType] = "name",
+        phrase: bool = False,
+    ) -> List[Auction]:
+        """Find Auctions containing all words of a query, ignoring case and color codes
+
+        Unlike find_auctions this matches whole words only, which is answered from an index built once per snapshot
+
+        :param query: The words to search for
+        :param by: Whether to search names or lore
+        :param phrase: Whether the words have to appear in the same order as in the query
+        """
+        if isinstance(by, str):
+            by = FilterType[str(by).upper()]
+        if by not in (FilterType.NAME, FilterType.LORE):
             return []
+        index = await asyncio.to_thread(self.text_index, by)
+        return self.take(index.phrase(query) if phrase else index.words(query))
+
+    def query(self, condition: Optional["Condition"] = None) -> "AuctionQuery":
+        """Start a query over this snapshot, eg. ``auctions.query(name("hyperion") & is_bin()).sort("starting_bid")``
+
+        :param condition: The condition auctions have to meet, see hypy.query. None to match every auction
+        """
+        from .query import AuctionQuery  # hypy.query imports this module
+
+        return AuctionQuery(self, condition)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple
+from .models import Suggestion
+from .pricing import name_key
+from .tokenindex import normalize
+
+if TYPE_CHECKING:
+    from .auctions import SkyblockAuctions
+    from .bazaar import Bazaar
+
+MAX_TYPOS = 2
+"""The maximum amount of typos in typed text"""
+
+FUZZY_PREFIX = 6
+"""Misspelled words are looked up with at most this many of their characters"""
+
+LATENCY_BUDGET = 0.001
+"""The time in seconds a suggestion for one keystroke should take at most, see Autocomplete.keystroke_latency"""
+
+
+def _key(name: str) -> str:
+    return " ".join(normalize(name).replace("_", " ").split())
+
+
+def _max_distance(length: int) -> int:
+    """The typos allowed in a word of a length, none up to 2 characters, 1 up to 5 and 2 above"""
+    return 0 if length <= 2 else 1 if length <= 5 else 2
+
+
+def _deletions(text: str, distance: int) -> Set[str]:
+    """All strings made by deleting up to distance characters from text"""
+    variants = shorter = {text}
+    for _ in range(distance):
+        shorter = {v[:i] + v[i + 1 :] for v in shorter for i in range(len(v))}
+        variants |= shorter
+    return variants
+
+
+def _distances(text: str, word: str, max_distance: int) -> Tuple[int, int]:
+    """The edit distances between text and word and between text and the closest start of word
+
+    Distances over max_distance are returned as max_distance + 1.
+    """
+    row = list(range(len(text) + 1))
+    closest = row[-1]
+    for i, char in enumerate(word, 1):
+        above, row = row, [i]
+        for j, typed in enumerate(text, 1):
+            row.append(min(above[j] + 1, row[j - 1] + 1, above[j - 1] + (typed != char)))
+        closest = min(closest, row[-1])
+        if min(row) > max_distance:  # the rest of word can't get any closer
+            break
+    return min(row[-1], max_distance + 1), min(closest, max_distance + 1)
+
+
+class Autocomplete:
+    """Suggests item names for partially typed text
+
+    Names are matched case insensitive at the start of any of their words, eg. "shortbow" suggests "Juju Shortbow".
+    Misspelled words are matched with a deletion index of the distinct words of all names, which is built up front,
+    so the time of a suggestion depends on the amount of typed words and not on the amount of names.
+    Building takes a moment for thousands of names, so create this in a thread when the event loop is running.
+
+    :param counts: The amount of occurrences of every name
+    """
+
+    def __init__(self, counts: Dict[str, int]) -> None:
+        self.names: List[str] = sorted(counts, key=lambda name: (-counts[name], _key(name)))
+        """All names, the most common first"""
+        self.counts: List[int] = [counts[name] for name in self.names]
+        """The amount of occurrences of every name"""
+        # rows are positions in names, so the smallest rows are the most common names
+        # a name is found by the start of any of its words
+        entries: List[Tuple[str, int]] = []
+        words: Set[str] = set()
+        for i, name in enumerate(self.names):
+            name_words = _key(name).split(" ")
+            words.update(name_words)
+            entries += [(" ".join(name_words[start:]), i) for start in range(len(name_words))]
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._rows = [i for _, i in entries]
+        # deletion variants of the first characters of words to the words, by the amount of characters and typos
+        self._similar: Dict[Tuple[int, int], Dict[str, List[str]]] = {}
+        for length in range(3, FUZZY_PREFIX + 1):
+            for distance in range(1, _max_distance(length) + 1):
+                index = self._similar[(length, distance)] = {}
+                for word in words:
+                    for variant in _deletions(word[:length], distance):
+                        index.setdefault(variant, []).append(word)
+
+    @classmethod
+    def from_sources(
+        cls, auctions: SkyblockAuctions = None, bazaar: Bazaar = None
+    ) -> Autocomplete:
+        """Build suggestions from the item names of auctions and the product ids of the bazaar
+
+        Item names are used without color codes and stars.
+
+        :param auctions: The auctions
+        :param bazaar: The bazaar
+        """
+        counts: Counter = Counter()
+        if auctions is not None:
+            counts.update(name_key(data) for data in auctions.records)
+        if bazaar is not None:
+            counts.update(item.product_id for item in bazaar)
+        return cls(counts)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _top(self, rows, limit: int, distance: int = 0) -> List[Suggestion]:
+        best = heapq.nsmallest(limit, set(rows))
+        return [Suggestion(self.names[i], self.counts[i], distance) for i in best]
+
+    def prefix(self, text: str, limit: int = 10) -> List[Suggestion]:
+        """Names with a word starting with text, the most common first
+
+        :param text: The typed text
+        :param limit: The maximum amount of suggestions
+        """
+        positions = self._starting_with(_key(text))
+        return self._top(self._rows[positions.start : positions.stop], limit)
+
+    def _starting_with(self, start: str) -> range:
+        """Positions in _keys of keys starting with start"""
+        first = bisect_left(self._keys, start)
+        # every key starting with start sorts before start followed by the highest character
+        return range(first, bisect_left(self._keys, start + "\U0010ffff", first))
+
+    def _words_like(self, typed: str, max_distance: int, whole: bool) -> List[Tuple[str, int]]:
+        """Words with at most max_distance typos in typed and the amount of typos
+
+        :param typed: The typed word
+        :param max_distance: The maximum amount of typos
+        :param whole: Whether typed is the whole word or only its start
+        """
+        max_distance = min(max_distance, _max_distance(len(typed)))
+        if not max_distance:
+            return [(typed, 0)]
+        head = typed[:FUZZY_PREFIX]
+        index = self._similar[(len(head), max_distance)]
+        # the index finds every word starting like typed, the rest of typed is checked with the whole word
+        words: Set[str] = set()
+        for variant in _deletions(head, max_distance):
+            words.update(index.get(variant, ()))
+        similar = []
+        for word in words:
+            distance = _distances(typed, word, max_distance)[0 if whole else 1]
+            if distance <= max_distance:
+                similar.append((word, distance))
+        return similar
+
+    def fuzzy(self, text: str, limit: int = 10) -> List[Suggestion]:
+        """Names with words starting like the typed words apart from typos, the fewest typos and most common first
+
+        Every typed word but the last has to be a whole word of the name. Words of up to 2 characters can't have typos,
+        words of up to 5 characters can have 1 and longer words 2, with at most MAX_TYPOS in the whole text.
+
+        :param text: The typed text
+        :param limit: The maximum amount of suggestions
+        """
+        *complete, last = _key(text).split(" ")
+        # starts of keys with similar whole words and their typos
+        starts = [("", 0)]
+        for typed in complete:
+            similar = self._words_like(typed, MAX_TYPOS - min(t for _, t in starts), True)
+            starts = [
+                (start + word + " ", typos + distance)
+                for start, typos in starts
+                for word, distance in similar
+                if typos + distance <= MAX_TYPOS and self._starting_with(start + word + " ")
+            ]
+            if not starts:
+                return []
+        by_distance: Dict[int, Set[int]] = {}
+        similar = self._words_like(last, MAX_TYPOS - min(t for _, t in starts), False)
+        for start, typos in starts:
+            for word, distance in similar:
+                if typos + distance <= MAX_TYPOS:
+                    positions = self._starting_with(start + word)
+                    by_distance.setdefault(typos + distance, set()).update(
+                        self._rows[positions.start : positions.stop]
+                    )
+        # a name matched with several words only keeps its closest match
+        seen: Set[int] = set()
+        suggestions: List[Suggestion] = []
+        for distance in sorted(by_distance):
+            rows = by_distance[distance] - seen
+            seen |= rows
+            if len(suggestions) < limit:
+                suggestions += self._top(rows, limit - len(suggestions), distance)
+        return suggestions
+
+    def suggest(self, text: str, limit: int = 10) -> List[Suggestion]:
+        """Prefix matches, followed by fuzzy matches if there are less than limit
+
+        :param text: The typed text
+        :param limit: The maximum amount of suggestions
+        """
+        suggestions = self.prefix(text, limit)
+        if len(suggestions) < limit:
+            known = {suggestion.name for suggestion in suggestions}
+            suggestions += [
+                s for s in self.fuzzy(text, limit) if s.name not in known
+            ][: limit - len(suggestions)]
+        return suggestions
+
+    def keystroke_latency(self, texts: Iterable[str], limit: int = 10) -> float:
+        """The time in seconds of the slowest suggest call while typing texts one character at a time
+
+        Use this to check that suggestions for the names in use stay within LATENCY_BUDGET.
+
+        :param texts: The texts to type, eg. names with typos
+        :param limit: The maximum amount of suggestions
+        """
+        slowest = 0.0
+        for text in texts:
+            for end in range(1, len(text) + 1):
+                start = perf_counter()
+                self.suggest(text[:end], limit)
+                slowest = max(slowest, perf_counter() - start)
+        return slowest
@@ -17,6 +17,11 @@ class Bazaar(HypyObject):
             BazaarItem(item_data) for item_data in self._raw["products"].values()
         ]
 
+    @property
+    def last_updated(self) -> int:
+        """The lastUpdated value of the API data this object was built from"""
+        return self._timestamp
+
     def __getitem__(self, key) -> BazaarItem:
         return self._items[key]
 
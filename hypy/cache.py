@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Optional, Tuple
+from .models import CacheStats
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "player": 60,
+    "guild": 60,
+    "friends": 60,
+    "skyblock/profile": 60,
+}
+"""Default time to live of responses in seconds, by endpoint"""
+
+
+class ResponseCache:
+    """An in-memory LRU cache for Hypixel API responses
+
+    Only endpoints with a time to live are cached. Pass an instance of this to the Hypixel constructor to use it.
+
+    :param ttls: Time to live in seconds by endpoint (eg. ``{"player": 60}``), defaults to DEFAULT_TTLS
+    :param max_bytes: The maximum size of all cached response bodies combined
+    """
+
+    def __init__(
+        self, ttls: Dict[str, float] = None, *, max_bytes: int = 64 * 1024 * 1024
+    ) -> None:
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(endpoint: str, params: dict) -> tuple:
+        return endpoint.strip("/"), tuple(sorted(params.items()))
+
+    def _pop(self, key) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, endpoint: str, params: dict) -> Optional[Tuple[int, dict]]:
+        """Get a cached response, None if it is not cached or expired
+
+        :param endpoint: The endpoint of the request
+        :param params: The parameters of the request
+        """
+        key = self._key(endpoint, params)
+        if not self.ttls.get(key[0]):
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= monotonic():
+            self._pop(key)
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(
+        self, endpoint: str, params: dict, response: Tuple[int, dict], size: int
+    ) -> None:
+        """Cache a response if its endpoint has a time to live
+
+        :param endpoint: The endpoint of the request
+        :param params: The parameters of the request
+        :param response: The status and data of the response
+        :param size: The size of the response body in bytes
+        """
+        key = self._key(endpoint, params)
+        ttl = self.ttls.get(key[0])
+        if not ttl or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (monotonic() + ttl, response, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit and miss counters of the cache"""
+        return CacheStats(self._hits, self._misses, len(self._entries), self._bytes)
+
+
+class ItemCache(OrderedDict):
+    """Decoded auction items by auction uuid, used as Hypixel.item_cache
+
+    The least recently used items are dropped once there are more than max_size. Getting an item counts as a use,
+    checking whether an item is cached does not.
+
+    :param max_size: The maximum amount of items
+    """
+
+    def __init__(self, max_size: int = 100000) -> None:
+        super().__init__()
+        self.max_size = max_size
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
@@ -149,3 +149,12 @@ class MaroNoSuccess(HypyException):
 
     def __init__(self, status, cause) -> None:
         super().__init__("Maro returned status={}, cause: {}".format(status, cause))
+
+
+class MissingDependencyException(HypyException):
+    """Exception to raise when an optional dependency is not installed"""
+
+    def __init__(self, cause) -> None:
+        super().__init__(
+            "This requires {0}, install it with: pip install {0}".format(cause)
+        )
@@ -1,6 +1,8 @@
-from typing import Tuple, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, Optional, Union
 import asyncio
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from time import time_ns as timestamp
 from asyncio import sleep
 from urllib.parse import quote
@@ -20,10 +22,24 @@ from .exceptions import (
 from .guild import Guild
 from .hypixelresources import SkyBlockResources
 from .auctions import SkyblockAuctions
-from .auction import multi_init
+from .auction import Auction, multi_init
+from .auctioncolumns import multi_init_columns
 from . import utils
 from .utils import Utils
-from .models import KeyStats, WatchdogStats
+from .models import (
+    KeyStats,
+    WatchdogStats,
+    RateLimitBudget,
+    PlayerResult,
+    AuctionDelta,
+)
+from .ratelimit import RateLimiter
+from .cache import ItemCache, ResponseCache
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .transport import TransportSettings
+from .namecache import NameCache
+from .skyblockinventories import SkyblockItemSlot
 from .profile import SkyblockProfile
 from .bazaar import Bazaar
 from .hypixelfriends import HypixelFriends
@@ -31,6 +47,30 @@ from .playercounts import PlayerCounts
 from .ext.skyhelper import SkyHelperWrapper, SkyHelperCredentials
 
 
+STALE_WAIT_FRACTION = 0.02
+"""The fraction of the observed refresh interval to wait for before refetching stale auction pages"""
+
+STALE_WAIT_MIN = 0.25
+"""The minimum wait before refetching stale auction pages in seconds"""
+
+STALE_WAIT_MAX = 5.0
+"""The maximum wait before refetching stale auction pages in seconds"""
+
+
+def _stale_pages_wait(gap: int, rounds: int) -> float:
+    """Seconds to wait before refetching auction pages that are behind the newest one
+
+    The gap between the lastUpdated of the stale pages and the newest one is the time between two refreshes,
+    a refresh reaches all pages within a small fraction of that. The wait grows with every round
+    that still finds stale pages.
+
+    :param gap: The lastUpdated of the newest page minus the oldest lastUpdated of a stale page, in ms
+    :param rounds: The number of rounds that found stale pages, starting at 1
+    """
+    wait = gap / 1000 * STALE_WAIT_FRACTION * rounds
+    return min(STALE_WAIT_MAX, max(STALE_WAIT_MIN, wait))
+
+
 class Hypixel:
     """The main object used to interact with the Hypixel API
 
@@ -50,88 +90,194 @@ class Hypixel:
     _max_retries = 0
     _total_calls = 0
     skyhelper: Optional[SkyHelperWrapper] = None
+    cache: Optional[ResponseCache] = None
+    _last_auctions: Optional[SkyblockAuctions] = None
+    _last_bazaar: Optional[Bazaar] = None
 
     def __init__(
         self,
-        key,
+        key: Union[str, List[str]],
         *,
         session: aiohttp.ClientSession = None,
         debug: bool = False,
         retry: bool = False,
         max_retries: int = 5,
         loop: asyncio.AbstractEventLoop = None,
-        skyhelper_credentials: SkyHelperCredentials = None
+        skyhelper_credentials: SkyHelperCredentials = None,
+        ratelimit: bool = True,
+        cache: ResponseCache = None,
+        retry_policy: RetryPolicy = None,
+        transport: TransportSettings = None,
+        connector: aiohttp.BaseConnector = None,
+        mojang_batch_window: float = None,
+        name_cache: NameCache = None,
+        decode_workers: int = None
     ):
         if session is not None:
             self.session = session
-        self._apikey = key
+        self._apikeys = [key] if isinstance(key, str) else list(key)
+        self._apikey = self._apikeys[0]
+        self._key_calls = {apikey: 0 for apikey in self._apikeys}
         self._debug = debug
         self._retry = retry
         self._max_retries = max_retries
-        self._headers = {"API-Key": self._apikey}
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_attempts=max_retries + 1 if retry else 1)
+        self.retry_policy = retry_policy
+        self._ratelimiter = RateLimiter(wait=ratelimit)
+        self.cache = cache
+        self._inflight = SingleFlight()
+        self.transport = transport or TransportSettings()
+        self._connector = connector
+        self._mojang_batch_window = mojang_batch_window
+        self._name_cache = name_cache
+        self._decode_workers = decode_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.item_cache: Dict[str, SkyblockItemSlot] = ItemCache()
         self.loop = loop or asyncio.get_event_loop()
         if skyhelper_credentials:
             self.skyhelper = SkyHelperWrapper(self, skyhelper_credentials)
 
+    @property
+    def rate_limit(self) -> RateLimitBudget:
+        """The current request budget of the API key"""
+        return self._ratelimiter.budget(self._apikey)
+
+    @property
+    def rate_limits(self) -> Dict[str, RateLimitBudget]:
+        """The current request budget of every API key"""
+        return {key: self._ratelimiter.budget(key) for key in self._apikeys}
+
+    @property
+    def key_usage(self) -> Dict[str, int]:
+        """The amount of requests made with every API key"""
+        return dict(self._key_calls)
+
+    def _pick_key(self) -> str:
+        """Pick the API key with the most remaining budget"""
+        if len(self._apikeys) == 1:
+            return self._apikey
+
+        def score(key):
+            budget = self._ratelimiter.budget(key)
+            remaining = float("inf") if budget.remaining is None else budget.remaining
+            return remaining > 0, remaining, -(budget.reset or 0), -self._key_calls[key]
+
+        return max(self._apikeys, key=score)
+
+    @property
+    def connector(self) -> aiohttp.BaseConnector:
+        """The connector of the internal session, pass this to other clients to share the connection pool"""
+        return self.session.connector
+
+    @property
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        """The process pool used by SkyblockAuctions.decode_items, None unless decode_workers was passed"""
+        if self._executor is None and self._decode_workers:
+            self._executor = ProcessPoolExecutor(self._decode_workers)
+        return self._executor
 
     async def close(self) -> None:
         """Close internal session"""
         await self.session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._name_cache is not None:
+            await self._name_cache.close()
 
     async def setup(self) -> None:
         """Properly set up Hypixel object"""
         if not hasattr(self, "session"):
-            self.session = aiohttp.ClientSession(loop=self.loop)
-        self.mojang = Mojang(session=self.session)
+            self.session = self.transport.session(self._connector, loop=self.loop)
+        self.mojang = Mojang(
+            session=self.session,
+            batch_window=self._mojang_batch_window,
+            cache=self._name_cache,
+        )
         self._sb_resources = await self.update_resources()
         self.utils = Utils(self._sb_resources)
 
-    def _debug_url(self, endpoint, **params) -> str:
-        """Generate a debug url for endpoint and parameters"""
-        url = f"{self._base_url}{endpoint}?key={self._apikey}"
-        for key, value in params.items():
-            if key == "_HYPY_RETRIES":
-                continue
-            url += f"&{key}={quote(value)}"
+    def _debug_url(self, endpoint, api_key: str, **params) -> str:
+        """Generate a debug url for endpoint, the API key used and parameters"""
+        url = f"{self._base_url}{endpoint}?key={api_key}"
+        for name, value in params.items():
+            url += f"&{name}={quote(value)}"
         return url
 
-    async def _get(self, endpoint, **params) -> Tuple[int, dict]:
-        """GET something from the Hypixel API"""
-        self._total_calls += 1
+    async def _get(
+        self, endpoint, api_key: Optional[str] = None, **params
+    ) -> Tuple[int, dict]:
+        """GET something from the Hypixel API
+
+        Requests are sent with the API key that has the most remaining budget unless api_key is passed
+        """
         endpoint = endpoint.lstrip("/")  # is this even needed
-        if self._debug:
-            print(self._debug_url(endpoint, **params))
+        if self.cache is not None and api_key is None:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+        return await self._inflight.do(
+            (endpoint, api_key, tuple(sorted(params.items()))),
+            lambda: self._request(endpoint, api_key, **params),
+        )
+
+    async def _request(
+        self, endpoint, api_key: Optional[str] = None, **params
+    ) -> Tuple[int, dict]:
+        """GET something from the Hypixel API, bypassing the cache"""
         url = f"{self._base_url}{endpoint}?"
-        retries = 0
-        if "_HYPY_RETRIES" in params:
-            retries = int(params["_HYPY_RETRIES"])
-            del params["_HYPY_RETRIES"]
         for key, value in params.items():
             url += f"{key}={quote(value)}&"
         url = url[:-1]
-        async with self.session.get(url, headers=self._headers) as res:
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            key = api_key or self._pick_key()
+            if self._debug:
+                print(self._debug_url(endpoint, key, **params))
+            self._total_calls += 1
+            self._key_calls[key] = self._key_calls.get(key, 0) + 1
+            await self._ratelimiter.acquire(key)
             try:
-                jsn = await res.json(loads=orjson.loads)
-                if not jsn["success"]:
-                    raise HypixelNoSuccess(jsn["cause"])
-                return res.status, jsn
-            except aiohttp.client_exceptions.ContentTypeError:
+                async with self.session.get(url, headers={"API-Key": key}) as res:
+                    self._ratelimiter.update(key, res.headers)
+                    if res.status in policy.statuses and attempt < policy.max_attempts:
+                        retry_after = res.headers.get("Retry-After")
+                    else:
+                        jsn = await res.json(loads=orjson.loads)
+                        if not jsn["success"]:
+                            raise HypixelNoSuccess(jsn["cause"])
+                        if self.cache is not None and api_key is None:
+                            self.cache.put(
+                                endpoint,
+                                params,
+                                (res.status, jsn),
+                                len(await res.read()),
+                            )
+                        return res.status, jsn
+            except aiohttp.ContentTypeError:
                 if self._debug:
                     print("In contenttype handler")
-                if not self._retry:
+                if policy.max_attempts <= 1:
                     raise ContentTypeException(res.headers.get("content-type"))
-                if retries > self._max_retries:
-                    raise ExceededMaxRetries(self._max_retries)
+                if attempt >= policy.max_attempts:
+                    raise ExceededMaxRetries(policy.max_attempts - 1)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
                 if self._debug:
-                    print("RETRYING {} RETRY NUMBER {}".format(url, retries + 1))
-                rrq = await self._get(
-                    endpoint, **dict(**params, **{"_HYPY_RETRIES": retries + 1})
-                )
-                return rrq[0], rrq[1]
+                    traceback.print_exc()
+                if attempt >= policy.max_attempts:
+                    raise
             except aiohttp.ClientResponseError:
                 if self._debug:
                     traceback.print_exc()
                 raise
+            delay = policy.delay(attempt, retry_after)
+            if self._debug:
+                print("RETRYING {} IN {:.2f}s RETRY NUMBER {}".format(url, delay, attempt))
+            await sleep(delay)
 
     async def get_player(self, nameOrUuid: str) -> Player:
         """Returns a Player object for a given name or UUID
@@ -146,6 +292,41 @@ class Hypixel:
         _, response = await self._get("/player", uuid=nameOrUuid)
         return Player(response, nameOrUuid, self)
 
+    async def get_players(
+        self, namesOrUuids: Iterable[str], *, concurrency: int = 10
+    ) -> AsyncIterator[PlayerResult]:
+        """Fetch many players, yielding a PlayerResult for each one as soon as it is done
+
+        Failing players do not abort the batch, their exception is reported in PlayerResult.error instead
+
+        :param namesOrUuids: The names or uuids of the players
+        :param concurrency: The maximum amount of players fetched at the same time
+        """
+        pending = iter(namesOrUuids)
+        results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+        async def worker() -> None:
+            for query in pending:
+                try:
+                    result = PlayerResult(query, await self.get_player(query), None)
+                except Exception as exc:  # pylint: disable=broad-except
+                    result = PlayerResult(query, None, exc)
+                await results.put(result)
+            await results.put(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(concurrency, 1))]
+        running = len(workers)
+        try:
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                yield result
+        finally:
+            for task in workers:
+                task.cancel()
+
     async def get_player_status(self, nameOrUuid: str) -> PlayerStatus:
         """Returns status of player
 
@@ -185,9 +366,12 @@ class Hypixel:
             return Guild(response, self)
         return None
 
-    async def get_key_stats(self) -> KeyStats:
-        """Gets statistics of API Key"""
-        _, res = await self._get("/key")
+    async def get_key_stats(self, key: str = None) -> KeyStats:
+        """Gets statistics of API Key
+
+        :param key: The API key to get statistics of, defaults to the first key
+        """
+        _, res = await self._get("/key", key or self._apikey)
         res = res["record"]
         return KeyStats(
             res["owner"],
@@ -244,40 +428,148 @@ class Hypixel:
         _, response = await self._get("/friends", uuid=nameOrUuid)
         return HypixelFriends(response, self)
 
-    async def get_auctions(self) -> SkyblockAuctions:
-        """Gets Hypixel SkyBlock auctions"""
-        all_itime_equal = False
-        while not all_itime_equal:
-            _, init_response = await self._get("/skyblock/auctions")
-            i_time = init_response["lastUpdated"]
-            i_pages = init_response["totalPages"]
-            results = [
-                x[1]
-                for x in list(
-                    await asyncio.gather(
-                        *[
-                            self._get("skyblock/auctions", page=str(pn))
-                            for pn in range(1, i_pages)
-                        ]
-                    )
-                )
+    async def get_auctions(
+        self, *, reuse_unchanged: bool = False, columnar: bool = False
+    ) -> SkyblockAuctions:
+        """Gets Hypixel SkyBlock auctions
+
+        :param reuse_unchanged: Return the previously fetched auctions without downloading the remaining pages if lastUpdated did not change
+        :param columnar: Build SkyblockAuctions.columns instead of Auction objects, which are then only created when accessed. Requires numpy
+        """
+        _, init_response = await self._get("/skyblock/auctions")
+        i_time = init_response["lastUpdated"]
+        if (
+            reuse_unchanged
+            and self._last_auctions is not None
+            and self._last_auctions.last_updated == i_time
+        ):
+            return self._last_auctions
+        pages: Dict[int, dict] = {0: init_response}
+        stale = range(1, init_response["totalPages"])
+        rounds = 0
+        while stale:
+            responses = await asyncio.gather(
+                *[self._get("skyblock/auctions", page=str(pn)) for pn in stale]
+            )
+            pages.update(zip(stale, (x[1] for x in responses)))
+            # pages are refreshed one after another, so only the ones behind the newest are refetched
+            newest = max(pages.values(), key=lambda x: x["lastUpdated"])
+            i_time = newest["lastUpdated"]
+            for pn in [pn for pn in pages if pn >= newest["totalPages"]]:
+                del pages[pn]
+            stale = [
+                pn
+                for pn in range(newest["totalPages"])
+                if pn not in pages or pages[pn]["lastUpdated"] != i_time
             ]
-            results.insert(0, init_response)
-            all_itime_equal = all([i_time == x["lastUpdated"] for x in results])
-            if not all_itime_equal:
-                await sleep(10)  # i think this is good to do regardless
-        return SkyblockAuctions(
-            *await asyncio.to_thread(multi_init, results, self), self
+            behind = [pages[pn]["lastUpdated"] for pn in stale if pn in pages]
+            if behind:
+                rounds += 1
+                await sleep(_stale_pages_wait(i_time - min(behind), rounds))
+        results = [pages[pn] for pn in range(len(pages))]
+        if columnar:
+            raw, columns = await asyncio.to_thread(multi_init_columns, results)
+            auctions = SkyblockAuctions(raw, None, self, i_time, columns)
+        else:
+            auctions = SkyblockAuctions(
+                *await asyncio.to_thread(multi_init, results, self), self, i_time
+            )
+        auctions._drop_stale_items()
+        self._last_auctions = auctions if reuse_unchanged else None
+        return auctions
+
+    async def sync_auctions(self, auctions: SkyblockAuctions) -> AuctionDelta:
+        """Update auctions fetched with get_auctions in place instead of fetching all of them again
+
+        Ended auctions are removed using the auctions_ended endpoint, new and changed auctions are read
+        from the newest pages until a page contains auctions that are already known.
+        This should be called at least once a minute, auctions_ended only covers the last 60 seconds.
+
+        :param auctions: The auctions to update
+        """
+        _, ended = await self._get("/skyblock/auctions_ended")
+        removed = [auction["auction_id"] for auction in ended["auctions"]]
+        changed: List[dict] = []
+        last_updated = auctions.last_updated
+        page = 0
+        total_pages = 1
+        while page < total_pages:
+            if page == 0:
+                _, response = await self._get("/skyblock/auctions")
+                if response["lastUpdated"] == auctions.last_updated:
+                    break
+            else:
+                _, response = await self._get("skyblock/auctions", page=str(page))
+            last_updated = response["lastUpdated"]
+            total_pages = response["totalPages"]
+            reached_known = False
+            for data in response["auctions"]:
+                if auctions.record(data["uuid"]) == data:
+                    reached_known = True
+                else:
+                    changed.append(data)
+            if reached_known:
+                break
+            page += 1
+        # expired auctions without a buyer do not show up in auctions_ended
+        removed.extend(
+            data["uuid"] for data in auctions.records if data["end"] <= last_updated
         )
+        return auctions.update(changed, removed, last_updated)
+
+    async def iter_auctions(
+        self, *, max_in_flight: int = 8
+    ) -> AsyncIterator[List[Auction]]:
+        """Gets Hypixel SkyBlock auctions page by page, yielding the auctions of every page as soon as it arrived
+
+        Unlike get_auctions, pages are not checked for a consistent lastUpdated
+
+        :param max_in_flight: The maximum amount of pages downloaded at the same time
+        """
+
+        async def fetch(page: int) -> List[Auction]:
+            _, response = await self._get("skyblock/auctions", page=str(page))
+            return (await asyncio.to_thread(multi_init, [response], self))[1]
+
+        _, init_response = await self._get("/skyblock/auctions")
+        pages = iter(range(1, init_response["totalPages"]))
+        in_flight = {
+            asyncio.ensure_future(fetch(page))
+            for page in islice(pages, max(max_in_flight, 1))
+        }
+        try:
+            yield (await asyncio.to_thread(multi_init, [init_response], self))[1]
+            while in_flight:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    for page in islice(pages, 1):
+                        in_flight.add(asyncio.ensure_future(fetch(page)))
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
 
     async def find_guild(self, nameOrUuid) -> Optional[Guild]:
         """Deprecated, use Hypixel.getGuild instead"""
         return await self.get_guild(playerNameOrUuid=nameOrUuid)
 
-    async def get_bazaar(self) -> Bazaar:
-        """Gets bazaar information"""
+    async def get_bazaar(self, *, reuse_unchanged: bool = False) -> Bazaar:
+        """Gets bazaar information
+
+        :param reuse_unchanged: Return the previously built Bazaar if lastUpdated did not change
+        """
         _, response = await self._get("/skyblock/bazaar")
-        return Bazaar(response)
+        if (
+            reuse_unchanged
+            and self._last_bazaar is not None
+            and self._last_bazaar.last_updated == response["lastUpdated"]
+        ):
+            return self._last_bazaar
+        bazaar = Bazaar(response)
+        self._last_bazaar = bazaar if reuse_unchanged else None
+        return bazaar
 
     async def get_player_counts(self) -> PlayerCounts:
         """Get Hypixel Player counts"""
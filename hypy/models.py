@@ -1,4 +1,12 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional
 from dataclasses import dataclass
+from datetime import datetime
+
+if TYPE_CHECKING:
+    from .player import Player
+    from .auction import Auction
+    from .watchers import Watcher
 
 
 @dataclass
@@ -31,3 +39,110 @@ class WatchdogStats:
     """The amount of bans made by watchdog in the past day"""
     staff_total: int
     """The total amount of bans made by watchdog"""
+
+
+@dataclass
+class RateLimitBudget:
+    """The request budget of an API key"""
+
+    limit: Optional[int]
+    """The amount of requests allowed per window, None if unknown"""
+    remaining: Optional[int]
+    """The amount of requests left in the current window, None if unknown"""
+    reset: Optional[float]
+    """Seconds until the current window resets, None if unknown"""
+
+
+@dataclass
+class CacheStats:
+    """Statistics of a ResponseCache"""
+
+    hits: int
+    """The amount of requests answered from the cache"""
+    misses: int
+    """The amount of cacheable requests that went to the API"""
+    entries: int
+    """The amount of cached responses"""
+    size: int
+    """The size of all cached response bodies in bytes"""
+
+
+@dataclass
+class PlayerResult:
+    """The result of fetching a single player with Hypixel.get_players"""
+
+    query: str
+    """The name or uuid that was requested"""
+    player: Optional[Player]
+    """The player, None if fetching failed"""
+    error: Optional[Exception]
+    """The exception raised while fetching the player, None if it succeeded"""
+
+
+@dataclass
+class AuctionDelta:
+    """Changes applied to a SkyblockAuctions snapshot"""
+
+    added: List[Auction]
+    """Auctions that were not part of the snapshot before"""
+    removed: List[Auction]
+    """Auctions that ended"""
+    updated: List[Auction]
+    """Auctions that changed, eg. because of a new bid"""
+
+
+@dataclass
+class WatcherError:
+    """An exception raised while passing a matching auction to a Watcher"""
+
+    watcher: Watcher
+    """The watcher"""
+    auction: Auction
+    """The matching auction"""
+    error: Exception
+    """The exception raised by the callback of the watcher"""
+
+
+@dataclass
+class ItemPrice:
+    """BIN prices of an item"""
+
+    lowest: int
+    """The lowest BIN price"""
+    second_lowest: Optional[int]
+    """The second lowest BIN price, None if there is only one auction"""
+    median: float
+    """The median BIN price"""
+    count: int
+    """The amount of BIN auctions"""
+
+
+@dataclass
+class PricePoint:
+    """A price of an item at a point in time"""
+
+    timestamp: int
+    """The time of the price in ms"""
+    lowest: int
+    """The lowest BIN price"""
+    median: float
+    """The median BIN price"""
+    count: int
+    """The amount of BIN auctions"""
+
+    @property
+    def time(self) -> datetime:
+        """The time of the price"""
+        return datetime.utcfromtimestamp(self.timestamp / 1000)
+
+
+@dataclass
+class Suggestion:
+    """An autocomplete suggestion"""
+
+    name: str
+    """The item name or bazaar product id"""
+    count: int
+    """The amount of auctions and bazaar products with this name"""
+    distance: int
+    """The amount of typos in the typed text, 0 for prefix matches"""
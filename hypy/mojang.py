@@ -1,8 +1,11 @@
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Dict, Set
 from datetime import datetime
+import asyncio
 import aiohttp
 from orjson import orjson
 from .exceptions import UUIDNotFound, UsernameNotFound, InvalidHTTPCode
+from .singleflight import SingleFlight
+from .namecache import NameCache
 
 class NameHistoryEntry:
     """An Entry in a players name history"""
@@ -23,31 +26,124 @@ class Mojang:
     """A simple wrapper for Mojangs API
 
     If you are using this with hypy, the Hypixel class already has an instance of this class ready, you do not need to instantiate it yourself
+
+    If batch_window is set, name_to_uuid collects lookups for that many seconds and resolves them
+    through Mojangs bulk endpoint, up to 10 names per request.
     """
 
     session: aiohttp.ClientSession
     _base_url = "https://api.mojang.com/"
+    _bulk_size = 10
 
-    def __init__(self, *, session: aiohttp.ClientSession = None) -> None:
-        self.session = session or aiohttp.ClientSession()
+    def __init__(
+        self,
+        *,
+        session: aiohttp.ClientSession = None,
+        connector: aiohttp.BaseConnector = None,
+        batch_window: Optional[float] = None,
+        cache: NameCache = None
+    ) -> None:
+        self.session = session or aiohttp.ClientSession(
+            connector=connector, connector_owner=connector is None
+        )
+        self._inflight = SingleFlight()
+        self.batch_window = batch_window
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        self.cache = cache
 
     async def _get(self, endpoint, base_url="https://api.mojang.com/") -> Tuple[int, dict]:
         endpoint = endpoint.lstrip("/")  # is this even needed
         url = f"{base_url}{endpoint}"
+        return await self._inflight.do(url, lambda: self._request(url))
+
+    async def _request(self, url) -> Tuple[int, dict]:
         async with self.session.get(url) as res:
             return res.status, await res.json(loads=orjson.loads)
 
+    async def _post(self, endpoint, payload, base_url="https://api.mojang.com/") -> Tuple[int, dict]:
+        endpoint = endpoint.lstrip("/")
+        async with self.session.post(
+            f"{base_url}{endpoint}",
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        ) as res:
+            return res.status, await res.json(loads=orjson.loads)
+
+    def _flush(self) -> None:
+        """Send all pending name lookups in chunks of _bulk_size"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending = list(self._pending.items())
+        self._pending = {}
+        for i in range(0, len(pending), self._bulk_size):
+            # keep a reference, pending tasks without one can be garbage collected
+            task = asyncio.ensure_future(self._resolve_names(dict(pending[i : i + self._bulk_size])))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _resolve_names(self, batch: Dict[str, Tuple[str, asyncio.Future]]) -> None:
+        try:
+            status, response = await self._post(
+                "/profiles/minecraft", [name for name, _ in batch.values()]
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            for _, fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        found = {}
+        if status == 200:
+            for profile in response:
+                found[profile["name"].lower()] = profile["id"]
+                if self.cache is not None:
+                    self.cache.put(profile["name"], profile["id"])
+        for key, (name, fut) in batch.items():
+            if fut.done():
+                continue
+            if key in found:
+                fut.set_result(found[key])
+            elif status == 200:
+                fut.set_exception(UsernameNotFound(name))
+            else:
+                fut.set_result("")
+
+    async def _batched_name_to_uuid(self, name) -> str:
+        key = name.lower()
+        if key not in self._pending:
+            self._pending[key] = (name, asyncio.get_running_loop().create_future())
+        fut = self._pending[key][1]
+        if len(self._pending) >= self._bulk_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush
+            )
+        return await asyncio.shield(fut)
+
     async def close(self) -> None:
-        """Close internal aiohttp session"""
+        """Close internal aiohttp session and the name cache"""
         await self.session.close()
+        if self.cache is not None:
+            await self.cache.close()
 
     async def name_to_uuid(self, name) -> str:
         """Returns UUID for given name
 
         :param name: The name of the player
         """
+        if self.cache is not None:
+            cached = await self.cache.get_uuid(name)
+            if cached is not None:
+                return cached
+        if self.batch_window is not None:
+            return await self._batched_name_to_uuid(name)
         status, response = await self._get(f"/users/profiles/minecraft/{name}")
         if status == 200:
+            if self.cache is not None:
+                self.cache.put(response["name"], response["id"])
             return response["id"]
         elif status == 204:
             raise UsernameNotFound(name)
@@ -58,8 +154,14 @@ class Mojang:
 
         :param uuid: The uuid of the player
         """
+        if self.cache is not None:
+            cached = await self.cache.get_name(uuid)
+            if cached is not None:
+                return cached
         status, response = await self._get(f'session/minecraft/profile/{uuid}', 'https://sessionserver.mojang.com/')
         if status == 200:
+            if self.cache is not None:
+                self.cache.put(response["name"], response["id"])
             return response["name"]
         elif status == 400:
             raise UUIDNotFound(uuid)
@@ -0,0 +1,146 @@
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import time
+from typing import List, Optional, Set, Tuple
+
+
+class NameCache:
+    """A cache for name <-> uuid mappings used by Mojang
+
+    Lookups are answered from an in-memory LRU first and from an optional SQLite file second,
+    so mappings survive restarts. Pass an instance of this to the Hypixel or Mojang constructor to use it.
+    The SQLite file is only accessed in a thread, new mappings are written to it in one transaction per burst.
+
+    :param path: The path of the SQLite file, None to only cache in memory
+    :param ttl: Seconds after which a mapping is considered stale
+    :param max_entries: The maximum amount of mappings kept in memory
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, *, ttl: float = 86400.0, max_entries: int = 10000
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._by_name: OrderedDict = OrderedDict()
+        self._by_uuid: OrderedDict = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._unwritten: List[Tuple[str, str, float]] = []
+        self._writes: Set[asyncio.Task] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite file, only call this while holding _db_lock"""
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS names ("
+                "uuid TEXT PRIMARY KEY, name TEXT NOT NULL, "
+                "name_lower TEXT NOT NULL, fetched REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS names_name_lower ON names (name_lower)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _select(self, column: str, value: str) -> Optional[Tuple[str, str, float]]:
+        with self._db_lock:
+            row = (
+                self._connect()
+                .execute(f"SELECT name, uuid, fetched FROM names WHERE {column} = ?", (value,))
+                .fetchone()
+            )
+        return None if row is None else tuple(row)
+
+    def _write(self, entries: List[Tuple[str, str, float]]) -> None:
+        with self._db_lock:
+            db = self._connect()
+            with db:  # one transaction
+                for name, uuid, fetched in entries:
+                    # the name might have belonged to someone else before
+                    db.execute(
+                        "DELETE FROM names WHERE name_lower = ? AND uuid != ?",
+                        (name.lower(), uuid),
+                    )
+                    db.execute(
+                        "INSERT OR REPLACE INTO names VALUES (?, ?, ?, ?)",
+                        (uuid, name, name.lower(), fetched),
+                    )
+
+    @staticmethod
+    def _uuid(uuid: str) -> str:
+        return uuid.replace("-", "").lower()
+
+    def _remember(self, name: str, uuid: str, fetched: float) -> None:
+        entry = (name, uuid, fetched)
+        for index, key in ((self._by_name, name.lower()), (self._by_uuid, uuid)):
+            index[key] = entry
+            index.move_to_end(key)
+            if len(index) > self.max_entries:
+                index.popitem(last=False)
+
+    async def _lookup(self, column: str, value: str) -> Optional[Tuple[str, str, float]]:
+        index = self._by_name if column == "name_lower" else self._by_uuid
+        entry = index.get(value)
+        if entry is None and self.path is not None:
+            entry = await asyncio.to_thread(self._select, column, value)
+            if entry is not None:
+                self._remember(*entry)
+        if entry is None or entry[2] + self.ttl < time():
+            return None
+        index.move_to_end(value)
+        return entry
+
+    async def get_uuid(self, name: str) -> Optional[str]:
+        """Get the cached uuid of a name, None if it is unknown or stale
+
+        :param name: The name of the player
+        """
+        entry = await self._lookup("name_lower", name.lower())
+        return entry[1] if entry else None
+
+    async def get_name(self, uuid: str) -> Optional[str]:
+        """Get the cached name of a uuid, None if it is unknown or stale
+
+        :param uuid: The uuid of the player
+        """
+        entry = await self._lookup("uuid", self._uuid(uuid))
+        return entry[0] if entry else None
+
+    def put(self, name: str, uuid: str) -> None:
+        """Cache a mapping, it is written to the SQLite file in the background
+
+        :param name: The name of the player
+        :param uuid: The uuid of the player
+        """
+        uuid = self._uuid(uuid)
+        entry = (name, uuid, time())
+        self._remember(*entry)
+        if self.path is None:
+            return
+        self._unwritten.append(entry)
+        if len(self._unwritten) == 1:
+            # everything put until the event loop gets to this is written at once
+            task = asyncio.ensure_future(self.flush())
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def flush(self) -> None:
+        """Write all mappings that were not written to the SQLite file yet"""
+        entries, self._unwritten = self._unwritten, []
+        if entries:
+            await asyncio.to_thread(self._write, entries)
+
+    async def close(self) -> None:
+        """Write pending mappings and close the SQLite file"""
+        await self.flush()
+        if self._writes:
+            await asyncio.gather(*self._writes)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,149 @@
+from __future__ import annotations
+import os
+import mmap
+import struct
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List, Optional, Union
+from urllib.parse import quote, unquote
+from .models import ItemPrice, PricePoint
+from .utils import to_ms
+
+if TYPE_CHECKING:
+    from .auctions import SkyblockAuctions
+
+RECORD = struct.Struct("<qqdI4x")
+"""timestamp in ms, lowest price, median price, amount of auctions"""
+
+MINUTE = 60 * 1000
+
+
+class PriceHistory:
+    """An append-only store of BIN prices on disk
+
+    Every item gets a file of fixed-size records sorted by time, at most one per minute.
+    Files are memory-mapped for queries, so ranges are found with a binary search.
+
+    :param directory: The directory to store the files in, it is created if it does not exist
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, item: str) -> str:
+        return os.path.join(self.directory, quote(item, safe="") + ".bin")
+
+    def append(self, item: str, timestamp: Union[datetime, int], price: ItemPrice) -> bool:
+        """Append a price, returns False if the item already has a price for that minute or a later one
+
+        :param item: The item key
+        :param timestamp: The time of the price, in ms or as datetime
+        :param price: The price
+        """
+        timestamp = to_ms(timestamp) // MINUTE * MINUTE
+        with open(self._path(item), "ab+") as f:
+            size = f.tell()
+            if size % RECORD.size:
+                # a torn record of an interrupted append, writes always go to the end of the file
+                size -= size % RECORD.size
+                f.truncate(size)
+            if size:
+                f.seek(size - RECORD.size)
+                if RECORD.unpack(f.read(RECORD.size))[0] >= timestamp:
+                    return False
+            f.write(RECORD.pack(timestamp, price.lowest, price.median, price.count))
+        return True
+
+    def record(self, auctions: SkyblockAuctions, by: str = "name") -> int:
+        """Append the prices of every item of an auction snapshot, returns the amount of prices appended
+
+        :param auctions: The auctions
+        :param by: How to group auctions, see SkyblockAuctions.lowest_bins
+        """
+        prices = auctions.lowest_bins(by)
+        return sum(
+            self.append(item, auctions.last_updated, prices[item]) for item in prices
+        )
+
+    def items(self) -> List[str]:
+        """All items with a price history"""
+        return [
+            unquote(name[: -len(".bin")])
+            for name in os.listdir(self.directory)
+            if name.endswith(".bin")
+        ]
+
+    def query(
+        self,
+        item: str,
+        start: Union[datetime, int] = 0,
+        end: Optional[Union[datetime, int]] = None,
+    ) -> List[PricePoint]:
+        """Get the prices of an item between start (inclusive) and end (exclusive)
+
+        :param item: The item key
+        :param start: The start of the range, in ms or as datetime
+        :param end: The end of the range, in ms or as datetime, defaults to now
+        """
+        start = to_ms(start)
+        end = to_ms(end) if end is not None else to_ms(datetime.now(timezone.utc)) + 1
+        try:
+            f = open(self._path(item), "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            count = os.fstat(f.fileno()).st_size // RECORD.size
+            if not count:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mem:
+
+                def time_at(i: int) -> int:
+                    return RECORD.unpack_from(mem, i * RECORD.size)[0]
+
+                def bisect(time: int) -> int:
+                    lo, hi = 0, count
+                    while lo < hi:
+                        mid = (lo + hi) // 2
+                        if time_at(mid) < time:
+                            lo = mid + 1
+                        else:
+                            hi = mid
+                    return lo
+
+                return [
+                    PricePoint(*RECORD.unpack_from(mem, i * RECORD.size))
+                    for i in range(bisect(start), bisect(end))
+                ]
+
+    def downsample(
+        self,
+        item: str,
+        interval: int,
+        start: Union[datetime, int] = 0,
+        end: Optional[Union[datetime, int]] = None,
+    ) -> List[PricePoint]:
+        """Get the prices of an item aggregated into buckets
+
+        Every bucket has the lowest price, the mean median and the mean amount of auctions of its records
+
+        :param item: The item key
+        :param interval: The size of the buckets in ms
+        :param start: The start of the range, in ms or as datetime
+        :param end: The end of the range, in ms or as datetime, defaults to now
+        """
+        buckets: List[List[PricePoint]] = []
+        for point in self.query(item, start, end):
+            bucket_start = point.timestamp // interval * interval
+            if buckets and buckets[-1][0].timestamp // interval * interval == bucket_start:
+                buckets[-1].append(point)
+            else:
+                buckets.append([point])
+        return [
+            PricePoint(
+                bucket[0].timestamp // interval * interval,
+                min(point.lowest for point in bucket),
+                sum(point.median for point in bucket) / len(bucket),
+                round(sum(point.count for point in bucket) / len(bucket)),
+            )
+            for bucket in buckets
+        ]
@@ -0,0 +1,109 @@
+import re
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import AuctionDelta, ItemPrice
+from .utils import get_safe_content
+
+STAR_REGEX = re.compile(r"[✪➊➋➌➍➎]")
+
+
+def clean_name(item_name: str) -> str:
+    """An item name without color codes and stars"""
+    return STAR_REGEX.sub("", get_safe_content(item_name)).strip()
+
+
+def name_key(data: dict) -> str:
+    """Key auction data by item name without color codes and stars"""
+    return clean_name(data["item_name"])
+
+
+class PriceIndex(Mapping):
+    """Prices of BIN auctions grouped by item
+
+    Maps item keys to ItemPrice. The prices of every item are kept sorted,
+    so the index can be updated with single auctions instead of being rebuilt.
+
+    :param key: A function returning the item key of raw auction data, defaults to name_key
+    """
+
+    def __init__(self, key: Callable[[dict], str] = name_key) -> None:
+        self._key = key
+        self._prices: Dict[str, List[int]] = {}
+        self._auctions: Dict[str, Tuple[str, int]] = {}
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[dict], key: Callable[[dict], str] = name_key
+    ) -> "PriceIndex":
+        """Build an index from raw auction data
+
+        :param records: Raw auction data as returned by the API
+        :param key: A function returning the item key of raw auction data
+        """
+        index = cls(key)
+        for data in records:
+            if data.get("bin", False):
+                item = key(data)
+                index._auctions[data["uuid"]] = (item, data["starting_bid"])
+                index._prices.setdefault(item, []).append(data["starting_bid"])
+        for prices in index._prices.values():
+            prices.sort()
+        return index
+
+    def add(self, data: dict) -> None:
+        """Add an auction, auctions that are not BIN are ignored
+
+        :param data: Raw auction data
+        """
+        if not data.get("bin", False) or data["uuid"] in self._auctions:
+            return
+        item = self._key(data)
+        self._auctions[data["uuid"]] = (item, data["starting_bid"])
+        insort(self._prices.setdefault(item, []), data["starting_bid"])
+
+    def remove(self, auction_uuid: str) -> None:
+        """Remove an auction
+
+        :param auction_uuid: The uuid of the auction
+        """
+        entry = self._auctions.pop(auction_uuid, None)
+        if entry is None:
+            return
+        item, price = entry
+        prices = self._prices[item]
+        del prices[bisect_left(prices, price)]
+        if not prices:
+            del self._prices[item]
+
+    def apply(self, delta: AuctionDelta) -> None:
+        """Apply the changes of SkyblockAuctions.update
+
+        :param delta: The changes
+        """
+        for auction in delta.removed + delta.updated:
+            self.remove(auction.raw["uuid"])
+        for auction in delta.added + delta.updated:
+            self.add(auction.raw)
+
+    def __getitem__(self, item: str) -> ItemPrice:
+        prices = self._prices[item]
+        mid = len(prices) // 2
+        median = prices[mid] if len(prices) % 2 else (prices[mid - 1] + prices[mid]) / 2
+        return ItemPrice(
+            prices[0], prices[1] if len(prices) > 1 else None, median, len(prices)
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._prices)
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def lowest(self, item: str) -> Optional[int]:
+        """The lowest BIN price of an item, None if there is none
+
+        :param item: The item key
+        """
+        prices = self._prices.get(item)
+        return prices[0] if prices else None
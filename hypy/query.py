@@ -0,0 +1,376 @@
+from __future__ import annotations
+import heapq
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence
+from .auction import Auction
+from .auctions import PRICE_KEYS, FilterType
+from .exceptions import InvalidQueryTypeException
+from .auctioncolumns import np
+from .tokenindex import normalize
+from .utils import to_ms
+
+if TYPE_CHECKING:
+    from .auctions import SkyblockAuctions
+
+VECTORIZE_MIN_ROWS = 256
+"""Filters over fewer rows are checked in Python, converting them to arrays costs more"""
+
+SORT_KEYS = {
+    "starting_bid": "starting_bid",
+    "highest_bid": "highest_bid_amount",
+    "start": "start",
+    "end": "end",
+}
+
+
+class Condition(ABC):
+    """A condition auctions have to meet, combine conditions with ``&`` and ``|``
+
+    Conditions are created with the functions of this module, eg. ``name("hyperion") & price(high=10**9)``
+    """
+
+    cost = 3
+    """How expensive the index of this condition is, conditions with cheaper indexes are used first"""
+
+    def __and__(self, other: Condition) -> Condition:
+        return And(self, other)
+
+    def __or__(self, other: Condition) -> Condition:
+        return Or(self, other)
+
+    def estimate(self, auctions: SkyblockAuctions) -> int:
+        """An upper bound of the amount of matching auctions"""
+        return len(auctions)
+
+    def rows(self, auctions: SkyblockAuctions) -> List[int]:
+        """Positions of all matching auctions in ascending order"""
+        return self.filter(auctions, list(range(len(auctions))))
+
+    @abstractmethod
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        """The positions in rows of matching auctions"""
+
+
+class And(Condition):
+    """Auctions meeting all of the conditions"""
+
+    def __init__(self, *conditions: Condition) -> None:
+        self.conditions: List[Condition] = []
+        for condition in conditions:
+            if isinstance(condition, And):
+                self.conditions.extend(condition.conditions)
+            else:
+                self.conditions.append(condition)
+        self.cost = min(c.cost for c in self.conditions)
+
+    def _plan(self, auctions: SkyblockAuctions) -> List[Condition]:
+        return sorted(self.conditions, key=lambda c: (c.cost, c.estimate(auctions)))
+
+    def estimate(self, auctions: SkyblockAuctions) -> int:
+        return min(c.estimate(auctions) for c in self.conditions)
+
+    def rows(self, auctions: SkyblockAuctions) -> List[int]:
+        first, *rest = self._plan(auctions)
+        return self._filter(auctions, first.rows(auctions), rest)
+
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        return self._filter(auctions, rows, self._plan(auctions))
+
+    @staticmethod
+    def _filter(
+        auctions: SkyblockAuctions, rows: List[int], conditions: List[Condition]
+    ) -> List[int]:
+        for condition in conditions:
+            if not rows:
+                break
+            rows = condition.filter(auctions, rows)
+        return rows
+
+
+class Or(Condition):
+    """Auctions meeting any of the conditions"""
+
+    def __init__(self, *conditions: Condition) -> None:
+        self.conditions: List[Condition] = []
+        for condition in conditions:
+            if isinstance(condition, Or):
+                self.conditions.extend(condition.conditions)
+            else:
+                self.conditions.append(condition)
+        self.cost = max(c.cost for c in self.conditions)
+
+    def estimate(self, auctions: SkyblockAuctions) -> int:
+        return min(len(auctions), sum(c.estimate(auctions) for c in self.conditions))
+
+    def rows(self, auctions: SkyblockAuctions) -> List[int]:
+        return sorted(set().union(*(c.rows(auctions) for c in self.conditions)))
+
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        matched = set()
+        remaining = rows
+        for condition in self.conditions:
+            matched.update(condition.filter(auctions, remaining))
+            remaining = [i for i in remaining if i not in matched]
+        return [i for i in rows if i in matched]
+
+
+class _Owner(Condition):
+    cost = 0
+
+    def __init__(self, by: FilterType, owner: str) -> None:
+        self.by = by
+        self.owner = owner
+
+    def estimate(self, auctions: SkyblockAuctions) -> int:
+        return len(auctions.owner_rows(self.by, self.owner))
+
+    def rows(self, auctions: SkyblockAuctions) -> List[int]:
+        return list(auctions.owner_rows(self.by, self.owner))
+
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        owned = set(auctions.owner_rows(self.by, self.owner))
+        return [i for i in rows if i in owned]
+
+
+class _Range(Condition):
+    cost = 1
+
+    def __init__(self, key: str, column: str, low: Optional[int], high: Optional[int]) -> None:
+        self.key = key
+        self.column = column
+        self.low = low
+        self.high = high
+
+    def _bounds(self, auctions: SkyblockAuctions):
+        values, order = auctions.sorted_by(self.key)
+        first = 0 if self.low is None else bisect_left(values, self.low)
+        last = len(values) if self.high is None else bisect_right(values, self.high)
+        return order, first, last
+
+    def estimate(self, auctions: SkyblockAuctions) -> int:
+        _, first, last = self._bounds(auctions)
+        return last - first
+
+    def rows(self, auctions: SkyblockAuctions) -> List[int]:
+        order, first, last = self._bounds(auctions)
+        return sorted(order[first:last])
+
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        low = float("-inf") if self.low is None else self.low
+        high = float("inf") if self.high is None else self.high
+        if np is not None and len(rows) >= VECTORIZE_MIN_ROWS:
+            rows = np.asarray(rows)
+            values = getattr(auctions.columns, self.column)[rows]
+            return rows[(values >= low) & (values <= high)].tolist()
+        raw, key = auctions.records, self.key
+        return [i for i in rows if low <= raw[i][key] <= high]
+
+
+class _Text(Condition):
+    cost = 2
+
+    def __init__(self, by: FilterType, text: str) -> None:
+        self.by = by
+        self.key = "item_name" if by == FilterType.NAME else "item_lore"
+        self.text = text.lower()
+
+    def rows(self, auctions: SkyblockAuctions) -> List[int]:
+        return sorted(auctions.text_index(self.by).substring(self.text))
+
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        texts = auctions.indexed_texts(self.by)
+        if texts is not None:  # already normalized
+            return [i for i in rows if self.text in texts[i]]
+        raw, key = auctions.records, self.key
+        return [i for i in rows if self.text in normalize(raw[i][key])]
+
+
+class _Equals(Condition):
+    cost = 3
+
+    def __init__(
+        self, key: str, column: str, table: Optional[str], values: Sequence
+    ) -> None:
+        self.key = key
+        self.column = column
+        self.table = table
+        self.values = set(values)
+
+    def filter(self, auctions: SkyblockAuctions, rows: List[int]) -> List[int]:
+        if np is not None and len(rows) >= VECTORIZE_MIN_ROWS:
+            columns = auctions.columns
+            rows = np.asarray(rows)
+            column = getattr(columns, self.column)[rows]
+            if self.table is None:
+                mask = np.isin(column, list(self.values))
+            else:
+                table = getattr(columns, self.table)
+                codes = [code for code, value in enumerate(table) if value in self.values]
+                mask = np.isin(column, codes)
+            return rows[mask].tolist()
+        raw, key, values = auctions.records, self.key, self.values
+        if key == "bin":
+            return [i for i in rows if raw[i].get("bin", False) in values]
+        return [i for i in rows if raw[i][key] in values]
+
+
+def name(text: str) -> Condition:
+    """Auctions with an item name containing text, case insensitive
+
+    :param text: The text to search for
+    """
+    return _Text(FilterType.NAME, text)
+
+
+def lore(text: str) -> Condition:
+    """Auctions with an item lore containing text, case insensitive
+
+    :param text: The text to search for
+    """
+    return _Text(FilterType.LORE, text)
+
+
+def auctioneer(uuid: str) -> Condition:
+    """Auctions created by a player
+
+    :param uuid: The uuid of the player
+    """
+    return _Owner(FilterType.AUCTIONEER, uuid)
+
+
+def profile(profile_id: str) -> Condition:
+    """Auctions created by a profile
+
+    :param profile_id: The id of the profile
+    """
+    return _Owner(FilterType.PROFILE, profile_id)
+
+
+def tier(*tiers: str) -> Condition:
+    """Auctions of any of the tiers
+
+    :param tiers: Tiers like "LEGENDARY"
+    """
+    return _Equals("tier", "tier", "tiers", [t.upper() for t in tiers])
+
+
+def category(*categories: str) -> Condition:
+    """Auctions of any of the categories
+
+    :param categories: Categories like "weapon"
+    """
+    return _Equals("category", "category", "categories", [c.lower() for c in categories])
+
+
+def is_bin(value: bool = True) -> Condition:
+    """BIN auctions, or auctions that are not BIN if value is False
+
+    :param value: Whether the auctions have to be BIN
+    """
+    return _Equals("bin", "bin", None, [value])
+
+
+def price(
+    low: Optional[int] = None, high: Optional[int] = None, *, by: str = "starting_bid"
+) -> Condition:
+    """Auctions with a price between low and high, both inclusive
+
+    :param low: The minimum price, None for no minimum
+    :param high: The maximum price, None for no maximum
+    :param by: Either "starting_bid" or "highest_bid"
+    """
+    if by not in PRICE_KEYS:
+        raise InvalidQueryTypeException(by)
+    return _Range(PRICE_KEYS[by], by, low, high)
+
+
+def ends(start: Optional[datetime] = None, end: Optional[datetime] = None) -> Condition:
+    """Auctions ending between start and end, both inclusive
+
+    :param start: The earliest end time, None for no limit
+    :param end: The latest end time, None for no limit
+    """
+    return _Range("end", "end", to_ms(start), to_ms(end))
+
+
+class AuctionQuery:
+    """A query over a SkyblockAuctions snapshot, usually started with SkyblockAuctions.query
+
+    Conditions are planned to start with the cheapest index (auctioneer and profile, then prices and end times,
+    then names and lores), the remaining conditions only check the auctions that are left. Auction objects are only
+    created for results that are iterated over.
+
+    :param auctions: The auctions to query
+    :param condition: The condition auctions have to meet, None to match every auction
+    """
+
+    def __init__(
+        self, auctions: SkyblockAuctions, condition: Optional[Condition] = None
+    ) -> None:
+        self.auctions = auctions
+        self.condition = condition
+        self._sort: Optional[str] = None
+        self._reverse = False
+        self._limit: Optional[int] = None
+
+    def where(self, condition: Condition) -> AuctionQuery:
+        """Add a condition that has to be met as well
+
+        :param condition: The condition
+        """
+        self.condition = condition if self.condition is None else self.condition & condition
+        return self
+
+    def sort(self, by: str, reverse: bool = False) -> AuctionQuery:
+        """Sort the results
+
+        :param by: One of "starting_bid", "highest_bid", "start" and "end"
+        :param reverse: Whether to sort descending
+        """
+        self._sort = SORT_KEYS[by]
+        self._reverse = reverse
+        return self
+
+    def limit(self, limit: int) -> AuctionQuery:
+        """Return at most limit results
+
+        :param limit: The maximum amount of results
+        """
+        self._limit = limit
+        return self
+
+    def rows(self) -> List[int]:
+        """Positions of the results in the snapshot"""
+        auctions = self.auctions
+        if self.condition is None:
+            if self._sort is not None:
+                order = auctions.sorted_by(self._sort)[1]
+                rows = order[::-1] if self._reverse else order
+                return rows[: self._limit]
+            return list(range(len(auctions)))[: self._limit]
+        rows = self.condition.rows(auctions)
+        if self._sort is not None:
+            raw, key = auctions.records, self._sort
+            if self._limit is not None:
+                pick = heapq.nlargest if self._reverse else heapq.nsmallest
+                return pick(self._limit, rows, key=lambda i: raw[i][key])
+            rows.sort(key=lambda i: raw[i][key], reverse=self._reverse)
+        return rows[: self._limit]
+
+    def __iter__(self) -> Iterator[Auction]:
+        auctions = self.auctions
+        return (auctions[i] for i in self.rows())
+
+    def all(self) -> List[Auction]:
+        """All results as a list"""
+        return list(self)
+
+    def first(self) -> Optional[Auction]:
+        """The first result, None if there is none"""
+        return next(iter(self), None)
+
+    def count(self) -> int:
+        """The amount of results"""
+        return len(self.rows())
@@ -0,0 +1,114 @@
+import asyncio
+from time import monotonic
+from typing import Dict, Mapping, Optional
+from .models import RateLimitBudget
+
+
+class TokenBucket:
+    """Request budget of a single API key
+
+    The bucket is filled from the ``RateLimit-*`` headers Hypixel sends with every response
+    and refilled completely once the current window resets.
+    """
+
+    __slots__ = ("limit", "tokens", "reset_at", "_lock")
+
+    def __init__(self) -> None:
+        self.limit: Optional[int] = None
+        self.tokens: Optional[int] = None
+        self.reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.reset_at and now >= self.reset_at:
+            self.tokens = self.limit
+            self.reset_at = 0.0
+
+    async def acquire(self, wait: bool = True) -> None:
+        """Take a token from the bucket, waiting for the window to reset if it is empty
+
+        :param wait: Whether to wait for a token or to take one regardless
+        """
+        async with self._lock:
+            while wait:
+                now = monotonic()
+                self._refill(now)
+                # without a known reset there is nothing to wait for, let the API decide
+                if self.tokens is None or self.tokens > 0 or not self.reset_at:
+                    break
+                await asyncio.sleep(self.reset_at - now)
+            if self.tokens is not None:
+                self.tokens -= 1
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Update the bucket from response headers
+
+        :param headers: The headers of a response
+        """
+        try:
+            remaining = int(headers["RateLimit-Remaining"])
+            reset = int(headers["RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return
+        limit = headers.get("RateLimit-Limit")
+        now = monotonic()
+        self._refill(now)
+        reset_at = now + reset
+        if self.tokens is None or reset_at > self.reset_at + 1:
+            # first response or a new window
+            self.tokens = remaining
+        else:
+            # requests still in flight already took their token locally
+            self.tokens = min(self.tokens, remaining)
+        if limit is not None and limit.isdigit():
+            self.limit = int(limit)
+        self.reset_at = reset_at
+
+    def budget(self) -> RateLimitBudget:
+        """The current budget of this bucket"""
+        now = monotonic()
+        self._refill(now)
+        return RateLimitBudget(
+            self.limit,
+            self.tokens,
+            max(self.reset_at - now, 0.0) if self.reset_at else None,
+        )
+
+
+class RateLimiter:
+    """Keeps a TokenBucket per API key"""
+
+    def __init__(self, *, wait: bool = True) -> None:
+        self.wait = wait
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        """Get the bucket of an API key
+
+        :param key: The API key
+        """
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket()
+        return self._buckets[key]
+
+    async def acquire(self, key: str) -> None:
+        """Wait for a free slot of an API key
+
+        :param key: The API key
+        """
+        await self.bucket(key).acquire(self.wait)
+
+    def update(self, key: str, headers: Mapping[str, str]) -> None:
+        """Update the budget of an API key from response headers
+
+        :param key: The API key
+        :param headers: The headers of the response
+        """
+        self.bucket(key).update(headers)
+
+    def budget(self, key: str) -> RateLimitBudget:
+        """Get the current budget of an API key
+
+        :param key: The API key
+        """
+        return self.bucket(key).budget()
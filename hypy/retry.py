@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import random
+from typing import FrozenSet, Optional
+
+
+@dataclass
+class RetryPolicy:
+    """A dataclass describing how failed requests to the Hypixel API are retried
+
+    Requests are retried on the status codes in ``statuses``, on timeouts, on connection errors
+    and when the API returns something that is not JSON (eg. a Cloudflare error page).
+    """
+
+    max_attempts: int = 5
+    """The maximum amount of attempts per request, including the first one"""
+    backoff_base: float = 0.5
+    """The delay before the first retry in seconds, doubled for every further retry"""
+    backoff_max: float = 30.0
+    """The maximum delay between two attempts in seconds"""
+    jitter: float = 0.5
+    """The fraction of the delay that is randomized"""
+    statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    """HTTP status codes that are retried"""
+    respect_retry_after: bool = True
+    """Whether to wait as long as the Retry-After header says"""
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next attempt
+
+        :param attempt: The number of the attempt that just failed, starting at 1
+        :param retry_after: The value of the Retry-After header of the failed response
+        """
+        if retry_after and self.respect_retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random())
@@ -0,0 +1,99 @@
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, List
+from .utils import get_safe_content
+
+TOKEN_REGEX = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Strip color codes and lower a text the way TokenIndex does"""
+    return get_safe_content(text).lower()
+
+
+def _intersect(candidates: List[int], posting: array) -> List[int]:
+    """Keep the candidates that are in a sorted posting list"""
+    if len(candidates) * 8 > len(posting):
+        members = set(posting)
+        return [i for i in candidates if i in members]
+    kept = []
+    for i in candidates:
+        pos = bisect_left(posting, i)
+        if pos < len(posting) and posting[pos] == i:
+            kept.append(i)
+    return kept
+
+
+class TokenIndex:
+    """An inverted index mapping words to the positions of the texts containing them
+
+    Texts are normalized with normalize, so all queries are case insensitive.
+
+    :param texts: The texts to index
+    """
+
+    def __init__(self, texts: List[str]) -> None:
+        self.texts = [normalize(text) for text in texts]
+        """The normalized texts"""
+        postings: Dict[str, array] = {}
+        for i, text in enumerate(self.texts):
+            for token in set(TOKEN_REGEX.findall(text)):
+                if token not in postings:
+                    postings[token] = array("i")
+                postings[token].append(i)
+        self._postings = postings
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _match(self, postings: List[array]) -> List[int]:
+        if not postings:
+            return list(range(len(self.texts)))
+        postings = sorted(postings, key=len)
+        candidates = list(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates = _intersect(candidates, posting)
+        return candidates
+
+    def words(self, query: str) -> List[int]:
+        """Positions of texts containing every word of the query
+
+        :param query: The words to search for
+        """
+        empty = array("i")
+        tokens = set(TOKEN_REGEX.findall(query.lower()))
+        return self._match([self._postings.get(token, empty) for token in tokens])
+
+    def phrase(self, query: str) -> List[int]:
+        """Positions of texts containing the words of the query in the same order
+
+        :param query: The phrase to search for
+        """
+        tokens = TOKEN_REGEX.findall(query.lower())
+        if not tokens:
+            return self.words(query)
+        pattern = re.compile(
+            r"(?<!\w)" + r"\W+".join(map(re.escape, tokens)) + r"(?!\w)"
+        )
+        return [i for i in self.words(query) if pattern.search(self.texts[i])]
+
+    def substring(self, query: str) -> List[int]:
+        """Positions of texts containing the query, like ``query.lower() in text.lower()``
+
+        Every word of the query has to be part of a word in a matching text,
+        so only texts containing such words are compared.
+
+        :param query: The text to search for
+        """
+        query = query.lower()
+        postings = []
+        for token in set(TOKEN_REGEX.findall(query)):
+            matches = [self._postings[w] for w in self._postings if token in w]
+            if sum(len(posting) for posting in matches) > len(self.texts) // 2:
+                continue  # too common to narrow anything down
+            merged = sorted(set().union(*matches))
+            postings.append(array("i", merged))
+        return [i for i in self._match(postings) if query in self.texts[i]]
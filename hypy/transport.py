@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Optional
+import aiohttp
+
+
+@dataclass
+class TransportSettings:
+    """A dataclass containing connection pool and timeout settings
+
+    Pass an instance of this to the Hypixel constructor, the defaults match the ones of aiohttp.
+    """
+
+    limit: int = 100
+    """The maximum amount of simultaneous connections, 0 for no limit"""
+    limit_per_host: int = 0
+    """The maximum amount of simultaneous connections to a single host, 0 for no limit"""
+    keepalive_timeout: float = 15.0
+    """Seconds to keep idle connections open for reuse"""
+    ttl_dns_cache: Optional[int] = 10
+    """Seconds to cache DNS lookups for, None to cache forever"""
+    total_timeout: Optional[float] = 300.0
+    """The timeout of a whole request in seconds"""
+    connect_timeout: Optional[float] = None
+    """The timeout for acquiring and establishing a connection in seconds"""
+    read_timeout: Optional[float] = None
+    """The timeout between two reads from the socket in seconds"""
+
+    def connector(self) -> aiohttp.TCPConnector:
+        """Create a connector with these settings"""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+    def timeout(self) -> aiohttp.ClientTimeout:
+        """Create a ClientTimeout with these settings"""
+        return aiohttp.ClientTimeout(
+            total=self.total_timeout,
+            connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+    def session(self, connector: aiohttp.BaseConnector = None, **kwargs) -> aiohttp.ClientSession:
+        """Create a ClientSession with these settings
+
+        :param connector: A connector to share instead of creating a new one, it will not be closed with the session
+        """
+        return aiohttp.ClientSession(
+            connector=connector or self.connector(),
+            connector_owner=connector is None,
+            timeout=self.timeout(),
+            **kwargs
+        )
@@ -1,8 +1,8 @@
 import re
-from typing import Union, Tuple
+from typing import Optional, Union, Tuple
 from io import BytesIO
 from base64 import b64decode
-from datetime import datetime
+from datetime import datetime, timezone
 from nbt.nbt import TAG_Compound, TAG_List
 from nbt import nbt
 from .vars import (
@@ -128,6 +128,11 @@ def unpack_nbt(tag):
         return tag.value
 
 
+def decode_item_bytes(item_bytes):
+    """decode and unpack the first item of each NBT blob, meant to run in a worker process"""
+    return [unpack_nbt(decode_nbt(raw_data))["i"][0] for raw_data in item_bytes]
+
+
 class Utils:
     """Some misc functions used in hypy"""
 
@@ -159,6 +164,15 @@ class Utils:
         return float(real_level)
 
 
+def to_ms(time: Optional[Union[datetime, int]]) -> Optional[int]:
+    """Return a time as milliseconds since the epoch, naive datetimes are UTC like Auction.end"""
+    if time is None or isinstance(time, int):
+        return time
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return int(time.timestamp() * 1000)
+
+
 def parse_timestamp(to_parse: str) -> datetime:
     """Return datetime for given timestamp"""
     if any([x in to_parse for x in ["AM", "PM"]]):
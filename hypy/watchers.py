@@ -0,0 +1,189 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+from .auction import Auction
+from .auctions import SkyblockAuctions
+from .models import AuctionDelta, WatcherError
+from .pricing import name_key
+from .tokenindex import normalize
+
+
+@dataclass(eq=False)
+class Watcher:
+    """A dataclass describing auctions to watch for, unset fields match every auction
+
+    Matching auctions are passed to callback and put into queue, whichever are set.
+    A full queue makes AuctionWatchers.check wait until there is room.
+    """
+
+    name: Optional[str] = None
+    """The item name without color codes and stars, eg. "Hyperion" """
+    item_id: Optional[str] = None
+    """The skyblock item id, eg. "HYPERION". Items of new auctions are decoded to check this"""
+    max_price: Optional[int] = None
+    """The maximum price, the starting bid of BIN auctions and the highest bid of other auctions"""
+    tier: Optional[str] = None
+    """The tier, eg. "LEGENDARY" """
+    bin_only: bool = False
+    """Whether to only match BIN auctions"""
+    lore_contains: Optional[str] = None
+    """Text the lore has to contain, case insensitive"""
+    callback: Optional[Callable[[Auction], Any]] = None
+    """A function or coroutine function called with every matching auction"""
+    queue: Optional[asyncio.Queue] = None
+    """A queue matching auctions are put into"""
+    _predicate: Callable[[dict], bool] = field(init=False, repr=False)
+    _unnamed_predicate: Callable[[dict], bool] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        checks: List[Callable[[dict], bool]] = []
+        if self.bin_only:
+            checks.append(lambda data: data.get("bin", False))
+        if self.tier is not None:
+            tier = self.tier.upper()
+            checks.append(lambda data: data["tier"] == tier)
+        if self.max_price is not None:
+            max_price = self.max_price
+            checks.append(
+                lambda data: max(data["highest_bid_amount"], data["starting_bid"])
+                <= max_price
+            )
+        if self.lore_contains is not None:
+            text = self.lore_contains.lower()
+            checks.append(lambda data: text in normalize(data["item_lore"]))
+        # the registry only checks watchers grouped by name against auctions of that name
+        self._unnamed_predicate = lambda data: all(check(data) for check in checks)
+        if self.name is None:
+            self._predicate = self._unnamed_predicate
+        else:
+            name = self.name
+            self._predicate = lambda data: name_key(data) == name and all(
+                check(data) for check in checks
+            )
+
+    def matches(self, auction: Auction) -> bool:
+        """Whether an auction matches everything except item_id, which needs the decoded item
+
+        :param auction: The auction
+        """
+        return self._predicate(auction.raw)
+
+
+class AuctionWatchers:
+    """A registry of Watchers that are only checked against auctions that are new since the last snapshot
+
+    Watchers are grouped by name and item id, so an auction is only checked against the watchers
+    for its item and the ones without a name or item id.
+    Exceptions raised by callbacks do not stop the check, they are kept in errors.
+    """
+
+    def __init__(self) -> None:
+        self._by_name: Dict[str, List[Watcher]] = {}
+        self._by_id: Dict[str, List[Watcher]] = {}
+        self._any: List[Watcher] = []
+        self._seen: Set[str] = set()
+        self._snapshot: Optional[SkyblockAuctions] = None
+        self._delta: Optional[AuctionDelta] = None
+        self.errors: List[WatcherError] = []
+        """The exceptions raised by callbacks during the last check"""
+
+    def _group(self, watcher: Watcher) -> List[Watcher]:
+        if watcher.item_id is not None:
+            return self._by_id.setdefault(watcher.item_id, [])
+        if watcher.name is not None:
+            return self._by_name.setdefault(watcher.name, [])
+        return self._any
+
+    def add(self, watcher: Watcher) -> Watcher:
+        """Register a watcher
+
+        :param watcher: The watcher
+        """
+        self._group(watcher).append(watcher)
+        return watcher
+
+    def remove(self, watcher: Watcher) -> None:
+        """Unregister a watcher
+
+        :param watcher: The watcher
+        """
+        group = self._group(watcher)
+        group.remove(watcher)
+        if not group:
+            if watcher.item_id is not None:
+                del self._by_id[watcher.item_id]
+            elif watcher.name is not None:
+                del self._by_name[watcher.name]
+
+    def __len__(self) -> int:
+        return (
+            len(self._any)
+            + sum(map(len, self._by_name.values()))
+            + sum(map(len, self._by_id.values()))
+        )
+
+    async def check(self, auctions: SkyblockAuctions, new: List[Auction]) -> int:
+        """Check auctions against all watchers, returns the amount of matches
+
+        :param auctions: The snapshot the auctions are part of
+        :param new: The auctions to check
+        """
+        if self._by_id and new:
+            items = await auctions.decode_items(new)
+        self.errors = []
+        matches = 0
+        for auction in new:
+            data = auction.raw
+            candidates = [(w, w._predicate) for w in self._any]
+            candidates += [
+                (w, w._unnamed_predicate) for w in self._by_name.get(name_key(data), [])
+            ]
+            if self._by_id:
+                candidates += [
+                    (w, w._predicate)
+                    for w in self._by_id.get(items[data["uuid"]].skyblock_item_id, [])
+                ]
+            for watcher, predicate in candidates:
+                if not predicate(data):
+                    continue
+                matches += 1
+                if watcher.callback is not None:
+                    try:
+                        result = watcher.callback(auction)
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except Exception as exc:  # pylint: disable=broad-except
+                        self.errors.append(WatcherError(watcher, auction, exc))
+                if watcher.queue is not None:
+                    await watcher.queue.put(auction)
+        return matches
+
+    async def feed(self, auctions: SkyblockAuctions) -> int:
+        """Check the auctions of a snapshot that were not seen before, returns the amount of matches
+
+        Pass every snapshot from get_auctions, or the same snapshot after every Hypixel.sync_auctions.
+        All auctions of the first snapshot are new.
+
+        :param auctions: The snapshot
+        """
+        if (
+            auctions is self._snapshot
+            and auctions.delta is not None
+            and auctions.delta is not self._delta
+        ):
+            new = auctions.delta.added
+            self._seen.difference_update(a.raw["uuid"] for a in auctions.delta.removed)
+            self._seen.update(auction.raw["uuid"] for auction in new)
+        elif auctions is self._snapshot and auctions.delta is self._delta:
+            new = []
+        else:
+            seen = self._seen
+            new = [
+                auctions[pos]
+                for pos, data in enumerate(auctions.records)
+                if data["uuid"] not in seen
+            ]
+            self._seen = {data["uuid"] for data in auctions.records}
+        self._snapshot = auctions
+        self._delta = auctions.delta
+        return await self.check(auctions, new)
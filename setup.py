@@ -18,5 +18,6 @@ setup(
     long_description=read("readme.rst"),
     packages=["hypy", "hypy.ext", "hypy.ext.collisions", "hypy.ext.senither", "hypy.ext.skyhelper"],
     install_requires=["aiohttp", "dataclasses", "aiofiles", "nbt", "orjson"],
+    extras_require={"numpy": ["numpy"]},
     python_requires=">=3.8,<4.0",
 )